@@ -1,392 +1,918 @@
-import argparse
-import os
-import smtplib
-import sys
-from datetime import datetime
-from email.mime.text import MIMEText
-import subprocess
-import platform
-
-def send_email(receiver_email, subject, body, sender_password=None, sender_email=None):
-    smtp_server = "smtp.gmail.com"
-    smtp_port = 587
-    
-    # Check for sender email
-    if sender_email is None:
-        print("Error: Sender email not provided. Use --sender-email argument.")
-        sys.exit(1)
-    
-    # Get password from parameter, environment variable, or prompt user
-    if sender_password is None:
-        sender_password = os.getenv('GMAIL_PASSWORD')
-        if sender_password is None:
-            print("Error: Sender email password not provided. Use --sender-email-pass argument or GMAIL_PASSWORD environment variable.")
-            sys.exit(1)
-
-    msg = MIMEText(body)
-    msg['Subject'] = subject
-    msg['From'] = sender_email
-    msg['To'] = receiver_email
-
-    try:
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()
-        server.login(sender_email, sender_password)
-        server.sendmail(sender_email, receiver_email, msg.as_string())
-        print(f"Email sent successfully to {receiver_email}")
-    except Exception as e:
-        print(f"Error sending email to {receiver_email}: {e}")
-        return False
-    finally:
-        if 'server' in locals() and server:
-            server.quit()
-    return True
-
-def send_pipeline_notification(receiver_email, status, workflow_url=None, failed_jobs=None, details=None, sender_password=None, sender_email=None, platform=None, commit_id=None):
-    """Send a pipeline completion notification email."""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
-    status_emoji = "✅" if status == "success" else "❌" if status == "failure" else "⚠️"
-    
-    subject = f"{status_emoji} TheRock Pipeline {status.title()} - Libraries & PyTorch Wheels - {platform}"
-    
-    body_parts = [
-        f"TheRock Pipeline Completion Notification",
-        f"=" * 45,
-        f"Status: {status.upper()}",
-        f"Timestamp: {timestamp}",
-        f"Pipeline: ROCm Libraries Build + PyTorch Wheel Creation",
-        "",
-    ]
-    
-    if workflow_url:
-        body_parts.extend([
-            f"Workflow Details: {workflow_url}",
-            "",
-        ])
-    
-    if failed_jobs and failed_jobs.strip():
-        body_parts.extend([
-            f"Failed Jobs: {failed_jobs}",
-            "",
-        ])
-    
-    if details:
-        body_parts.extend([
-            "Additional Details:",
-            "-" * 20,
-            details,
-            "",
-        ])
-
-
-    gpu_mapping = {
-        "gfx110X-all": [
-            "gpu_navi31xtx",      # AMD Radeon RX 7900 XTX - gfx1100
-            "gpu_navi31xt",       # AMD Radeon RX 7900 XT - gfx1100
-                        # "gpu_navi31xl",       # AMD Radeon RX 7900 GRE - gfx1100
-            "gpu_navi31xtw",      # AMD Radeon PRO W7900 - gfx1100
-                        # "Navi 31 XTW-DS",   # AMD Radeon PRO W7900 Dual Slot - gfx1100
-                        # "Navi 32 XTW",      # AMD Radeon PRO W7800 - gfx1100
-                        # "Navi 32 XTW 48GB", # AMD Radeon PRO W7800 48GB - gfx1100
-            "gpu_navi32xtx",      # AMD Radeon RX 7800 XT - gfx1101
-            "gpu_navi32xl",       # AMD Radeon RX 7700 XT - gfx1101
-            "gpu_navi33xt",
-                        # "Navi33",           # AMD Radeon RX 7600 XT / RX 7600 - gfx1102
-                        # "Navi33 GLXT",      # AMD Radeon PRO W7600 - gfx1102
-                        # "Navi33 GLXL"       # AMD Radeon PRO W7500 - gfx1102
-        ],
-        "gfx1150-all": [
-            "igpu_stx",
-        ],
-        "gfx1151": [
-            "igpu_stxh",
-        ],
-        "gfx120X-all": [
-            "gpu_navi48xt",       # AMD Radeon RX 9070 - gfx1201
-            "gpu_navi48xtx",      # AMD Radeon RX 9070 XT - gfx1201
-                        # "gpu_navi48xl",       # AMD Radeon RX 9070 GRE - gfx1201
-                        # "gpu_navi48xtw",      # AMD Radeon AI PRO R9700 - gfx1201
-            "gpu_navi44xl",       # AMD Radeon RX 9060 - gfx1200
-            "gpu_navi44xt",        # AMD Radeon RX 9060 XT - gfx1200
-            "mgpu_navi48xtw" # multi gpu setup
-        ],
-                    # "gfx115X-all": [
-                    #     "Radeon 8060S Graphics",  # AMD Ryzen AI Max+ 395 - gfx1151 Strix Halo
-                    #     "Radeon 8050S Graphics",  # AMD Ryzen AI Max 390/385 - gfx1151 Strix Halo
-                    #     "AMD Radeon 890M",        # AMD Ryzen AI 9 HX 375/370 - gfx1150 Strix Point
-                    #     "AMD Radeon 880M"         # AMD Ryzen AI 9 365 - gfx1150 Strix Point
-                    # ]
-    }
-
-    if platform.lower() == "linux":
-        s3_bucket_url = "https://therock-nightly-tarball.s3.amazonaws.com/"
-        
-        # Iterate through all GPU architecture patterns in the mapping
-        for arch_pattern, gpu_list in gpu_mapping.items():
-            # Add platform prefix
-            linux_arch_pattern = f"linux-{arch_pattern}"
-            
-            print(f"\nProcessing architecture pattern: {linux_arch_pattern}")
-            latest_linux_sdk_url = get_latest_s3_tarball(s3_bucket_url, linux_arch_pattern)
-            
-            if not latest_linux_sdk_url:
-                print(f"No Linux tarball found for {linux_arch_pattern}; skipping.")
-                continue
-
-            if not gpu_list:
-                print(f"ERROR: No GPUs found for architecture pattern '{linux_arch_pattern}'")
-                continue
-            
-            # Send an email for each GPU in the list
-            for gpu_tag in gpu_list:
-                print(f"Sending email for GPU: {gpu_tag}")
-                
-                email_body_parts = body_parts.copy()
-                email_body_parts.extend([
-                    "This pipeline includes:",
-                    "• ROCm libraries compilation and testing",
-                    "• PyTorch wheel building and validation",
-                    "• Cross-platform support (Linux & Windows)",
-                    "• Multiple GPU family targets (gfx94X, gfx110X, etc.)",
-                    "",
-                    "This notification was sent automatically by TheRock CI pipeline.",
-                    "PLATFORM: Ubuntu",
-                    f"THEROCK_SDK_URL: {latest_linux_sdk_url}",
-                    f"gpuArchPattern: {gpu_tag}",
-                    f"GH_COMMIT_ID: {commit_id if commit_id else 'N/A'}"
-                ])
-                
-                email_body = "\n".join(email_body_parts)
-                success = send_email(receiver_email, subject, email_body, sender_password, sender_email)
-                
-                if not success:
-                    print(f"Failed to send email for {gpu_tag}")
-                    # Continue with other GPUs even if one fails
-        
-        return True
-    
-    elif platform.lower() == "windows":
-        s3_bucket_url = "https://rocm.nightlies.amd.com/tarball/"
-        
-        # Iterate through all GPU architecture patterns in the mapping
-        for arch_pattern, gpu_list in gpu_mapping.items():
-            # Add platform prefix
-            windows_arch_pattern = f"windows-{arch_pattern}"
-            
-            print(f"\nProcessing architecture pattern: {windows_arch_pattern}")
-            latest_windows_sdk_url = get_latest_s3_tarball(s3_bucket_url, windows_arch_pattern)
-            
-            if not latest_windows_sdk_url:
-                print(f"No Windows tarball found for {windows_arch_pattern}; skipping.")
-                continue
-
-            if not gpu_list:
-                print(f"ERROR: No GPUs found for architecture pattern '{windows_arch_pattern}'")
-                continue
-            
-            # Send an email for each GPU in the list
-            for gpu_tag in gpu_list:
-                print(f"Sending email for GPU: {gpu_tag}")
-                
-                email_body_parts = body_parts.copy()
-                email_body_parts.extend([
-                    "This pipeline includes:",
-                    "• ROCm libraries compilation and testing",
-                    "• PyTorch wheel building and validation",
-                    "• Cross-platform support (Linux & Windows)",
-                    "• Multiple GPU family targets (gfx94X, gfx110X, etc.)",
-                    "",
-                    "This notification was sent automatically by TheRock CI pipeline.",
-                    "PLATFORM: Windows",
-                    f"THEROCK_SDK_URL: {latest_windows_sdk_url}",
-                    f"gpuArchPattern: {gpu_tag}",
-                    f"GH_COMMIT_ID: {commit_id if commit_id else 'N/A'}"
-                ])
-                
-                email_body = "\n".join(email_body_parts)
-                success = send_email(receiver_email, subject, email_body, sender_password, sender_email)
-                
-                if not success:
-                    print(f"Failed to send email for {gpu_tag}")
-                    # Continue with other GPUs even if one fails
-        
-        return True
-    
-    return True
-
-def run_command_with_logging(cmd: str, timeout: int = None) -> subprocess.CompletedProcess:
-    """
-    Execute a command with comprehensive logging.
-    
-    Args:
-        cmd: Command as a string
-        timeout: Maximum time in seconds to wait for command completion (None for no timeout)
-
-    Returns:
-        subprocess.CompletedProcess: The complete result object with returncode, stdout, stderr
-    """
-    try:
-        print(f"Running command: {cmd}")
-        if timeout:
-            print(f"Timeout: {timeout} seconds")
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=timeout)
-
-        # Log all output regardless of return code
-        print(f"Command exit code: {result.returncode}")
-        if result.stdout:
-            print("STDOUT:")
-            print(result.stdout)
-
-        if result.stderr:
-            print("STDERR:")
-            print(result.stderr)
-
-        # Check exit code and log result
-        if result.returncode != 0:
-            print(f"ERROR: Command failed with exit code {result.returncode}")
-        else:
-            print("✓ Command executed successfully")
-
-        return result
-
-    except subprocess.TimeoutExpired as e:
-        print(f"ERROR: Command timed out after {timeout} seconds")
-
-        # Return a mock result object with error code
-        class MockResult:
-            def __init__(self):
-                self.returncode = 124  # Standard timeout exit code
-                self.stdout = ""
-                self.stderr = f"Command timed out after {timeout} seconds"
-
-        return MockResult()
-
-    except Exception as e:
-        print(f"ERROR: Failed to execute command {cmd}: {e}")
-
-        # Return a mock result object with error code
-        class MockResult:
-            def __init__(self):
-                self.returncode = 1
-                self.stdout = ""
-                self.stderr = str(e)
-
-        return MockResult()
-
-def get_latest_s3_tarball(s3_bucket_url: str, gpu_arch_pattern: str) -> str:
-    """
-    Get the latest tar.gz file path from S3 bucket matching the GPU architecture pattern.
-    Args:
-        s3_bucket_url: The S3 bucket URL (e.g., "https://therock-nightly-tarball.s3.amazonaws.com/")
-        gpu_arch_pattern: The GPU architecture pattern to match (e.g., "linux-gfx120X")
-    Returns:
-        str: The full URL to the latest tar.gz file, or empty string if not found or error
-    """
-    if not s3_bucket_url or not gpu_arch_pattern:
-        print("ERROR: Both s3_bucket_url and gpu_arch_pattern are required")
-        return ""
-
-    print("GPU pattern before removing suffix: ", gpu_arch_pattern)
-    gpu_arch_pattern_base = gpu_arch_pattern.split("_")[0]  # Use only the part before underscore
-    print("GPU pattern after removing suffix: ", gpu_arch_pattern_base)
-    
-    # Add therock-dist- prefix only for rocm.nightlies.amd.com bucket
-    if "rocm.nightlies.amd.com" in s3_bucket_url:
-        search_pattern = f"therock-dist-{gpu_arch_pattern_base}"
-    else:
-        search_pattern = gpu_arch_pattern_base
-    
-    print(f"Searching for latest tarball in {s3_bucket_url} matching pattern {search_pattern}")
-
-    # Build the command to get the latest tarball matching the pattern
-    # Extract date suffix (YYYYMMDD) from filenames and sort numerically to get the latest build
-    # Date format in filenames: 7.10.0a20251113 or 7.9.0rc20251008 (8 digits at the end before .tar.gz)
-    # We extract just the date part, sort numerically, then get the corresponding full filename
-    if platform.system().lower() == "windows":
-        # Windows command using PowerShell - escape pattern for PowerShell
-        escaped_pattern = search_pattern.replace("[", "`[").replace("]", "`]")
-        cmd = f'powershell -Command "$content = (Invoke-WebRequest -Uri \'{s3_bucket_url}\' -UseBasicParsing).Content; $content | Select-String -Pattern \'<Key>([^<]*{escaped_pattern}[^<]*\\.tar\\.gz)</Key>\' -AllMatches | ForEach-Object {{$_.Matches.Groups[1].Value}} | Where-Object {{$_ -notmatch \'ADHOCBUILD\'}} | Sort-Object {{[regex]::Match($_, \'[0-9]{{8}}\').Value}} | Select-Object -Last 1"'
-    else:
-        # Linux/Mac command - handle both XML format (S3 AWS) and JavaScript array format (rocm.nightlies.amd.com)
-        # Use grep -oP with alternation to match either <Key>...</Key> or "name": "..."
-        cmd = f'curl -s "{s3_bucket_url}" | grep -oP \'(?<=<Key>)[^<]*{search_pattern}[^<]*\\.tar\\.gz(?=</Key>)|(?<="name": ")[^"]*{search_pattern}[^"]*\\.tar\\.gz(?=")\' | grep -v "ADHOCBUILD" | awk \'{{match($0, /[0-9]{{8}}/); print substr($0, RSTART, 8), $0}}\' | sort -k1 -n | tail -1 | cut -d" " -f2'
-
-    result = run_command_with_logging(cmd)
-
-    if result.returncode != 0:
-        print("ERROR: Failed to get S3 bucket listing")
-        return ""
-
-    # Get the filename from stdout
-    latest_filename = result.stdout.strip()
-
-    if not latest_filename:
-        print(f"ERROR: No tar.gz file found matching pattern '{search_pattern}'")
-        return ""
-
-    # Construct the full URL
-    # Ensure s3_bucket_url ends with / and filename doesn't start with /
-    base_url = s3_bucket_url.rstrip("/")
-    filename = latest_filename.lstrip("/")
-    full_url = f"{base_url}/{filename}"
-
-    print(f"Latest tarball found: {latest_filename}")
-    print(f"Full URL: {full_url}")
-
-    return full_url
-
-def main():
-    parser = argparse.ArgumentParser(description="Send TheRock pipeline completion notifications")
-    parser.add_argument("--receiver", required=True, help="Receiver email address")
-    parser.add_argument("--status", required=True, choices=["success", "failure", "warning"], 
-                       help="Pipeline status")
-    parser.add_argument("--workflow-url", help="URL to the GitHub workflow run")
-    parser.add_argument("--failed-jobs", help="Comma-separated list of failed jobs")
-    parser.add_argument("--details", help="Additional details about the pipeline")
-    
-    # Email configuration
-    parser.add_argument("--sender-email-pass", help="Sender email app password for authentication")
-    parser.add_argument("--sender-email", required=True, 
-                       help="Sender email address")
-    parser.add_argument("--platform", default="linux", 
-                       help="Chose platform: windows or linux.")
-    parser.add_argument("--commit-id", help="GitHub commit SHA")
-    
-    # Legacy support
-    parser.add_argument("--subject", help="Email subject (legacy mode)")
-    parser.add_argument("--body", help="Email body (legacy mode)")
-    
-    args = parser.parse_args()
-    
-    if args.subject and args.body:
-        # Legacy mode
-        success = send_email(args.receiver, args.subject, args.body, args.sender_email_pass, args.sender_email)
-        if not success:
-            sys.exit(1)
-    else:
-        # Pipeline notification mode
-        success = send_pipeline_notification(
-            receiver_email=args.receiver,
-            status=args.status,
-            workflow_url=args.workflow_url,
-            failed_jobs=args.failed_jobs,
-            details=args.details,
-            sender_password=args.sender_email_pass,
-            sender_email=args.sender_email,
-            platform=args.platform,
-            commit_id=args.commit_id
-        )
-        if not success:
-            sys.exit(1)
-
-# Example usage:
-if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        main()
-    else:
-        print("Usage: python sent_email.py --receiver EMAIL --status STATUS --sender-email EMAIL [options]")
-        print("Use --help for more information.")
-        sys.exit(1)
-
-
-
+import argparse
+import contextlib
+import dataclasses
+import functools
+import importlib.util
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import types
+from datetime import datetime
+from email.header import Header
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:
+    # Windows; the tarball cache is then updated without a lock
+    fcntl = None
+
+# smtplib, urllib.request (both pull in ssl), asyncio and the
+# optional packages below are imported where they are used, so --help and
+# --dry-run start without loading them
+
+# aiosmtplib is optional; it is only needed for --concurrent sends
+AIOSMTPLIB_AVAILABLE = importlib.util.find_spec("aiosmtplib") is not None
+
+# Buckets are listed with boto3 if it is installed, and otherwise by streaming
+# and scanning their listing page
+BOTO3_AVAILABLE = importlib.util.find_spec("boto3") is not None
+
+# The tarball listing helpers are shared with build_tools/trigger_orchestrai.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "build_tools"))
+from _therock_utils.tarball_listing import (
+    LISTING_CHUNK_SIZE,
+    TARBALL_PREFIX,
+    is_release_tarball,
+    s3_bucket_name,
+    scan_tarball_names,
+    tarball_sort_key,
+)
+
+SMTP_SERVER = "smtp.gmail.com"
+# Implicit TLS (SMTPS) saves the EHLO/STARTTLS/EHLO round trips of port 587
+SMTP_PORT = 465
+# Messages sent over one connection before it is recycled, to stay under
+# provider per-connection limits
+DEFAULT_MAX_PER_CONN = 100
+# Upper bound on --workers, i.e. on concurrent connections to the SMTP server
+MAX_POOL_SIZE = 5
+# Abort a batch once more than this fraction of it, and at least
+# ABORT_MIN_FAILURES emails, have failed; e.g. a bad password or an SMTP outage
+# would otherwise fail every remaining send one by one
+DEFAULT_ABORT_THRESHOLD = 1 / 3
+ABORT_MIN_FAILURES = 3
+# Git ref whose successful runs are notified; other refs only notify on
+# failure or warning unless --force is given
+NOTIFY_REF = "refs/heads/main"
+# Seconds a session may sit idle before it is checked with NOOP ahead of the
+# next send; servers drop idle connections, and a dead one would otherwise
+# only be noticed after a failed send
+SMTP_IDLE_CHECK_SECS = 30
+# Attempts per message, and the delay in seconds (doubled per retry) before
+# retrying a temporary 4xx rejection
+SEND_ATTEMPTS = 3
+SEND_RETRY_DELAY = 1
+# Seconds a resolved tarball URL is reused from the on-disk cache; nightly
+# tarballs are published at most once a day
+TARBALL_CACHE_TTL = 30 * 60
+# Seconds a looked-up sender password is reused before it is looked up again
+PASSWORD_CACHE_TTL = 15 * 60
+
+
+# Emoji and spellings used in the subject and body for each --status choice
+_STATUS_TABLE = {
+    "success": ("✅", "Success", "SUCCESS"),
+    "failure": ("❌", "Failure", "FAILURE"),
+    "warning": ("⚠️", "Warning", "WARNING"),
+}
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S UTC"
+
+_SEP45 = "=" * 45
+_SEP20 = "-" * 20
+
+
+# Fixed part of the notification body, rendered with str.format() once per
+# call; the SDK URL and GPU tag lines are appended per architecture and per GPU.
+# The optional workflow/failed/details blocks carry their own trailing blank line.
+_BODY_TEMPLATE = "\n".join([
+    "TheRock Pipeline Completion Notification",
+    _SEP45,
+    "Status: {status}",
+    "Timestamp: {timestamp}",
+    "Pipeline: ROCm Libraries Build + PyTorch Wheel Creation",
+    "",
+    "{workflow_block}{failed_block}{details_block}This pipeline includes:",
+    "• ROCm libraries compilation and testing",
+    "• PyTorch wheel building and validation",
+    "• Cross-platform support (Linux & Windows)",
+    "• Multiple GPU family targets (gfx94X, gfx110X, etc.)",
+    "",
+    "This notification was sent automatically by TheRock CI pipeline.",
+    "PLATFORM: {platform_label}",
+    "",
+])
+
+# GPU architecture pattern to the GPU tags that get a notification for it
+GPU_MAPPING = types.MappingProxyType({
+    "gfx110X-all": (
+        "gpu_navi31xtx",      # AMD Radeon RX 7900 XTX - gfx1100
+        "gpu_navi31xt",       # AMD Radeon RX 7900 XT - gfx1100
+        "gpu_navi31xtw",      # AMD Radeon PRO W7900 - gfx1100
+        "gpu_navi32xtx",      # AMD Radeon RX 7800 XT - gfx1101
+        "gpu_navi32xl",       # AMD Radeon RX 7700 XT - gfx1101
+        "gpu_navi33xt",
+    ),
+    "gfx1150-all": (
+        "igpu_stx",
+    ),
+    "gfx1151": (
+        "igpu_stxh",
+    ),
+    "gfx120X-all": (
+        "gpu_navi48xt",       # AMD Radeon RX 9070 - gfx1201
+        "gpu_navi48xtx",      # AMD Radeon RX 9070 XT - gfx1201
+        "gpu_navi44xl",       # AMD Radeon RX 9060 - gfx1200
+        "gpu_navi44xt",       # AMD Radeon RX 9060 XT - gfx1200
+        "mgpu_navi48xtw",     # multi gpu setup
+    ),
+})
+
+# Per-platform settings for the notification emails
+PLATFORM_INFO = {
+    "linux": {
+        "name": "Linux",
+        "label": "Ubuntu",
+        "s3_bucket_url": "https://therock-nightly-tarball.s3.amazonaws.com/",
+    },
+    "windows": {
+        "name": "Windows",
+        "label": "Windows",
+        "s3_bucket_url": "https://rocm.nightlies.amd.com/tarball/",
+    },
+}
+
+
+def _is_temporary_rejection(error):
+    """Return True if an SMTP error is a 4xx reply, which may succeed when retried."""
+    import smtplib
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        # An empty dict means no receivers at all, which a retry cannot fix
+        return bool(error.recipients) and all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return False
+
+
+@functools.lru_cache(maxsize=None)
+def _ssl_context():
+    """Create the TLS context once; loading the CA bundle is the expensive part."""
+    import ssl
+    return ssl.create_default_context()
+
+
+class SMTPSession:
+    """
+    Authenticated SMTP connection that is reused for several messages.
+
+    Opening a connection costs a TCP connect, a TLS handshake and a login,
+    so batch senders should send all their messages through one session instead
+    of calling send_email() per message. The connection is opened on the first
+    send(), recycled every max_per_conn messages and closed when the context
+    manager exits. A connection idle for more than SMTP_IDLE_CHECK_SECS is
+    checked with NOOP before it is reused.
+
+    A message is tried up to SEND_ATTEMPTS times: on a fresh connection if the
+    old one dropped, or after a backoff if the server replied with a temporary
+    4xx error. Permanent 5xx rejections are raised straight away.
+    """
+
+    def __init__(self, sender_email, sender_password, smtp_server=SMTP_SERVER, smtp_port=SMTP_PORT, max_per_conn=DEFAULT_MAX_PER_CONN):
+        self.sender_email = sender_email
+        self.sender_password = sender_password
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.max_per_conn = max_per_conn
+        self.server = None
+        self.count = 0
+        self.last_used = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def connect(self):
+        import smtplib
+        self.count = 0
+        server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, context=_ssl_context())
+        try:
+            # EHLO up front so the server's extensions (8BITMIME, SMTPUTF8) are known
+            server.ehlo()
+            server.login(self.sender_email, self.sender_password)
+        except Exception:
+            # Don't leave an unauthenticated connection behind for the next send()
+            server.close()
+            raise
+        self.server = server
+
+    def close(self):
+        import smtplib
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self.server = None
+
+    def is_alive(self):
+        import smtplib
+        if self.server is None:
+            return False
+        try:
+            return self.server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def send(self, receiver_email, msg):
+        """
+        Send msg, the serialized bytes from build_message(), to receiver_email
+        (an address or a list of addresses).
+
+        Returns the {address: (code, reply)} dict of any refused receivers;
+        SMTPRecipientsRefused is raised only if all of them were refused.
+        """
+        import smtplib
+        if self.server is None:
+            self.connect()
+        elif time.monotonic() - self.last_used > SMTP_IDLE_CHECK_SECS and not self.is_alive():
+            self._reconnect()
+        for attempt in range(1, SEND_ATTEMPTS + 1):
+            try:
+                refused = self.server.sendmail(self.sender_email, receiver_email, msg)
+                break
+            except (smtplib.SMTPException, OSError) as e:
+                if attempt == SEND_ATTEMPTS:
+                    raise
+                if not self.is_alive():
+                    self._reconnect()
+                elif _is_temporary_rejection(e):
+                    # e.g. 421/451 rate limiting or greylisting, which clear after a wait
+                    time.sleep(SEND_RETRY_DELAY * 2 ** (attempt - 1))
+                else:
+                    raise
+
+        self.last_used = time.monotonic()
+        self.count += 1
+        if self.max_per_conn and self.count >= self.max_per_conn:
+            # The next send() opens a fresh connection
+            self.close()
+        return refused
+
+    def _reconnect(self):
+        self.close()
+        self.connect()
+
+
+class SMTPSessionPool:
+    """
+    Fixed set of SMTPSessions shared by worker threads.
+
+    A worker borrows a session with session(), sends over it and returns it, so
+    at most size connections are open at once. Sessions connect lazily, so a
+    pool larger than the number of messages opens no extra connections.
+    """
+
+    def __init__(self, sender_email, sender_password, size=MAX_POOL_SIZE, max_per_conn=DEFAULT_MAX_PER_CONN):
+        self.size = size
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(SMTPSession(sender_email, sender_password, max_per_conn=max_per_conn))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @contextlib.contextmanager
+    def session(self):
+        session = self._idle.get()
+        try:
+            yield session
+        finally:
+            self._idle.put(session)
+
+    def close(self):
+        # Only called once the workers are done, so every session is idle
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+_password_cache = {}
+
+
+def _password_from_keyring(sender_email):
+    try:
+        import keyring
+        return keyring.get_password("gmail", sender_email)
+    except Exception:
+        # keyring is optional and its backends raise a variety of errors
+        return None
+
+
+def get_sender_password(sender_email):
+    """
+    Look up the sender's app password from GMAIL_PASSWORD or the system keyring.
+
+    The result is cached for PASSWORD_CACHE_TTL seconds so repeated sends in one
+    process do not repeat the lookup, while a rotated password is still picked up.
+    """
+    now = time.monotonic()
+    cached = _password_cache.get(sender_email)
+    if cached and now - cached[1] < PASSWORD_CACHE_TTL:
+        return cached[0]
+
+    password = os.getenv('GMAIL_PASSWORD') or _password_from_keyring(sender_email)
+    if password is not None:
+        _password_cache[sender_email] = (password, now)
+    return password
+
+
+def resolve_sender(sender_email=None, sender_password=None):
+    """Validate the sender address and resolve the password, exiting if either is missing."""
+    # Check for sender email
+    if sender_email is None:
+        print("Error: Sender email not provided. Use --sender-email argument.")
+        sys.exit(1)
+
+    # Get password from parameter, environment variable or keyring
+    if sender_password is None:
+        sender_password = get_sender_password(sender_email)
+        if sender_password is None:
+            print("Error: Sender email password not provided. Use --sender-email-pass argument, GMAIL_PASSWORD environment variable or the 'gmail' keyring entry.")
+            sys.exit(1)
+    return sender_email, sender_password
+
+
+def _encode_subject(subject):
+    return Header(subject, "utf-8").encode(linesep="\r\n")
+
+
+def _encode_body(body):
+    # 8-bit UTF-8 with CRLF line endings, as sent on the wire
+    body = body.replace("\r\n", "\n")
+    if not body.endswith("\n"):
+        body += "\n"
+    return body.replace("\n", "\r\n").encode("utf-8")
+
+
+def _format_receivers(receiver_email):
+    """Join a list of receivers for log messages."""
+    return receiver_email if isinstance(receiver_email, str) else ", ".join(receiver_email)
+
+
+def build_message(sender_email, receiver_email, subject, body):
+    """
+    Serialize a text/plain message to the bytes sent over SMTP. receiver_email
+    is an address or a list of addresses.
+
+    Several receivers share one message, so they are only named on the SMTP
+    envelope; the To header is left undisclosed, as with BCC, so that they
+    cannot see each other's addresses.
+    """
+    if isinstance(receiver_email, str):
+        to_header = receiver_email
+    elif len(receiver_email) == 1:
+        to_header = receiver_email[0]
+    else:
+        to_header = "undisclosed-recipients:;"
+    headers = (
+        f"From: {sender_email}\r\n"
+        f"To: {to_header}\r\n"
+        f"Subject: {_encode_subject(subject)}\r\n"
+        "MIME-Version: 1.0\r\n"
+        'Content-Type: text/plain; charset="utf-8"\r\n'
+        "Content-Transfer-Encoding: 8bit\r\n"
+        "\r\n"
+    )
+    return headers.encode("utf-8") + _encode_body(body)
+
+
+def send_email(receiver_email, subject, body, sender_password=None, sender_email=None, session=None):
+    """
+    Send a single email to an address or a list of addresses.
+
+    If session is given the message is sent over that already open SMTPSession,
+    otherwise a one-shot session is opened and closed around this message.
+    """
+    if session is None:
+        sender_email, sender_password = resolve_sender(sender_email, sender_password)
+    else:
+        sender_email = session.sender_email
+
+    msg = build_message(sender_email, receiver_email, subject, body)
+    receivers = _format_receivers(receiver_email)
+
+    try:
+        if session is None:
+            with SMTPSession(sender_email, sender_password) as one_shot:
+                refused = one_shot.send(receiver_email, msg)
+        else:
+            refused = session.send(receiver_email, msg)
+        print(f"Email sent successfully to {receivers}")
+    except Exception as e:
+        print(f"Error sending email to {receivers}: {e}")
+        return False
+    for address, (code, reply) in refused.items():
+        print(f"WARNING: {address} was refused: {code} {reply!r}")
+    return True
+
+def build_pipeline_emails(status, workflow_url=None, failed_jobs=None, details=None, platform=None, commit_id=None, timestamp=None):
+    """
+    Build the pipeline completion notification emails for a platform.
+
+    timestamp defaults to the current UTC time; pass one in to stamp several
+    calls for the same notification event identically.
+
+    Returns:
+        list: One (gpu_tag, subject, body) tuple per GPU tag with a tarball available
+    """
+    if timestamp is None:
+        timestamp = time.strftime(_TIMESTAMP_FORMAT, time.gmtime())
+    status_emoji, status_title, status_upper = _STATUS_TABLE.get(status) or ("⚠️", status.title(), status.upper())
+
+    subject = f"{status_emoji} TheRock Pipeline {status_title} - Libraries & PyTorch Wheels - {platform}"
+    
+    info = PLATFORM_INFO.get(platform.lower())
+    if info is None:
+        return []
+
+    # Everything in the body except the SDK URL and GPU tag is fixed per call
+    body_head = _BODY_TEMPLATE.format(
+        status=status_upper,
+        timestamp=timestamp,
+        workflow_block=f"Workflow Details: {workflow_url}\n\n" if workflow_url else "",
+        failed_block=f"Failed Jobs: {failed_jobs}\n\n" if failed_jobs and failed_jobs.strip() else "",
+        details_block=f"Additional Details:\n{_SEP20}\n{details}\n\n" if details else "",
+        platform_label=info["label"],
+    )
+    commit_line = f"GH_COMMIT_ID: {commit_id if commit_id else 'N/A'}"
+
+    emails = []
+
+    # Iterate through all GPU architecture patterns in the mapping
+    for arch_pattern, gpu_list in GPU_MAPPING.items():
+        # Add platform prefix
+        full_arch_pattern = f"{platform.lower()}-{arch_pattern}"
+
+        print(f"\nProcessing architecture pattern: {full_arch_pattern}")
+        latest_sdk_url = get_latest_s3_tarball(info["s3_bucket_url"], full_arch_pattern)
+
+        if not latest_sdk_url:
+            print(f"No {info['name']} tarball found for {full_arch_pattern}; skipping.")
+            continue
+
+        if not gpu_list:
+            print(f"ERROR: No GPUs found for architecture pattern '{full_arch_pattern}'")
+            continue
+
+        # Build an email for each GPU in the list
+        arch_head = f"{body_head}THEROCK_SDK_URL: {latest_sdk_url}\n"
+        for gpu_tag in gpu_list:
+            email_body = f"{arch_head}gpuArchPattern: {gpu_tag}\n{commit_line}"
+            emails.append((gpu_tag, subject, email_body))
+
+    return emails
+
+
+def _should_abort(failed, total, abort_threshold):
+    """Return True once enough of a batch of total emails has failed to give up on the rest."""
+    return failed >= ABORT_MIN_FAILURES and failed > total * abort_threshold
+
+
+def send_emails(receiver_email, emails, session, abort_threshold=DEFAULT_ABORT_THRESHOLD):
+    """
+    Send (gpu_tag, subject, body) emails over an SMTPSession.
+
+    receiver_email may be a list, in which case each email is sent once with
+    every receiver as a recipient, rather than once per receiver.
+
+    Returns the number of emails that failed; the rest of the batch is skipped
+    once _should_abort() says so.
+    """
+    failed = 0
+    for gpu_tag, subject, body in emails:
+        print(f"Sending email for GPU: {gpu_tag}")
+        success = send_email(receiver_email, subject, body, session=session)
+
+        if not success:
+            print(f"Failed to send email for {gpu_tag}")
+            failed += 1
+            if _should_abort(failed, len(emails), abort_threshold):
+                print(f"ERROR: {failed} of {len(emails)} emails failed; aborting remaining sends")
+                break
+            # Continue with other GPUs even if one fails
+    return failed
+
+
+def send_emails_pooled(receivers, emails, pool, abort_threshold=DEFAULT_ABORT_THRESHOLD):
+    """
+    Send (gpu_tag, subject, body) emails to all receivers from pool.size threads,
+    one multi-recipient send per email.
+
+    Sends are I/O bound, so spreading them over several connections cuts wall
+    time roughly by the pool size. Returns the number of emails that failed, as
+    send_emails() does.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    jobs = emails
+    lock = threading.Lock()
+    aborted = threading.Event()
+    failed = 0
+
+    def send_one(job):
+        nonlocal failed
+        gpu_tag, subject, body = job
+        if aborted.is_set():
+            return
+        print(f"Sending email for GPU: {gpu_tag}")
+        with pool.session() as session:
+            success = send_email(receivers, subject, body, session=session)
+        if success:
+            return
+        print(f"Failed to send email for {gpu_tag}")
+        with lock:
+            failed += 1
+            if _should_abort(failed, len(jobs), abort_threshold) and not aborted.is_set():
+                print(f"ERROR: {failed} of {len(jobs)} emails failed; aborting remaining sends")
+                aborted.set()
+
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        # list() re-raises any exception from a worker
+        list(executor.map(send_one, jobs))
+    return failed
+
+
+def print_emails(emails):
+    """Print the rendered emails instead of sending them."""
+    for gpu_tag, subject, body in emails:
+        print(f"=== {gpu_tag}")
+        print(f"Subject: {subject}")
+        print()
+        print(body)
+
+
+async def _send_emails_async(receivers, emails, sender_email, sender_password, size):
+    """
+    Send each email once to all receivers over size aiosmtplib connections on
+    one event loop, returning the failure count.
+    """
+    import asyncio
+    import aiosmtplib
+
+    clients = [
+        aiosmtplib.SMTP(hostname=SMTP_SERVER, port=SMTP_PORT, use_tls=True, tls_context=_ssl_context())
+        for _ in range(min(size, len(emails)))
+    ]
+
+    async def open_client(smtp):
+        await smtp.connect()
+        await smtp.login(sender_email, sender_password)
+
+    idle = asyncio.Queue()
+
+    async def send_one(gpu_tag, subject, body):
+        msg = build_message(sender_email, receivers, subject, body)
+        smtp = await idle.get()
+        try:
+            await smtp.sendmail(sender_email, receivers, msg)
+            print(f"Email sent successfully to {_format_receivers(receivers)} ({gpu_tag})")
+            return True
+        except aiosmtplib.SMTPException as e:
+            print(f"Error sending email to {_format_receivers(receivers)} ({gpu_tag}): {e}")
+            return False
+        finally:
+            idle.put_nowait(smtp)
+
+    try:
+        # Handshakes and logins overlap too
+        await asyncio.gather(*(open_client(smtp) for smtp in clients))
+        for smtp in clients:
+            idle.put_nowait(smtp)
+        results = await asyncio.gather(*(send_one(*email) for email in emails))
+    finally:
+        for smtp in clients:
+            try:
+                await smtp.quit()
+            except aiosmtplib.SMTPException:
+                pass
+    return results.count(False)
+
+
+def send_emails_concurrently(receivers, emails, sender_email, sender_password, size=MAX_POOL_SIZE):
+    """
+    Send each email once to all receivers, with up to size sends in flight over
+    as many aiosmtplib connections.
+
+    The asyncio counterpart of send_emails_pooled(): one event loop instead of
+    one thread per connection.
+
+    Returns:
+        bool: True if every email was sent
+    """
+    import asyncio
+
+    try:
+        failed = asyncio.run(_send_emails_async(receivers, emails, sender_email, sender_password, size))
+    except Exception as e:
+        print(f"Error sending emails to {_format_receivers(receivers)}: {e}")
+        return False
+    return failed == 0
+
+
+@dataclasses.dataclass(frozen=True)
+class Tarball:
+    """
+    A release tarball as described by the bucket listing.
+
+    size, last_modified and etag come straight from the list_objects_v2
+    Contents entries, so nothing here needs a HeadObject request per key.
+    They are None when the listing page was parsed instead.
+    """
+
+    name: str
+    size: Optional[int] = None
+    last_modified: Optional[datetime] = None
+    etag: Optional[str] = None
+
+
+def _list_s3_tarballs(bucket, prefix=""):
+    """
+    Yield a Tarball for each non-adhoc .tar.gz key in a public bucket that
+    starts with prefix.
+
+    The prefix lets S3 filter the listing server side, so unrelated keys are
+    not transferred.
+    """
+    import boto3
+    from botocore import UNSIGNED
+    from botocore.config import Config
+
+    s3 = boto3.client("s3", config=Config(signature_version=UNSIGNED))
+    paginator = s3.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            key = obj["Key"]
+            if is_release_tarball(key):
+                yield Tarball(key, obj.get("Size"), obj.get("LastModified"), obj.get("ETag", "").strip('"') or None)
+
+
+def _list_page_tarballs(s3_bucket_url):
+    """Stream a bucket listing page and yield a Tarball for each non-adhoc name in it."""
+    import urllib.request
+
+    with urllib.request.urlopen(s3_bucket_url, timeout=60) as response:
+        chunks = iter(lambda: response.read(LISTING_CHUNK_SIZE), b"")
+        for name in scan_tarball_names(chunks):
+            yield Tarball(name)
+
+
+@functools.lru_cache(maxsize=None)
+def _bucket_tarballs(s3_bucket_url):
+    """
+    List the non-adhoc release tarballs in a bucket, once per run.
+
+    get_latest_s3_tarball() matches each GPU pattern against this listing, so
+    sending every GPU's email costs one bucket listing. A failed listing
+    raises and is not cached.
+    """
+    print(f"Listing tarballs in {s3_bucket_url}")
+    bucket = s3_bucket_name(s3_bucket_url)
+    if bucket and BOTO3_AVAILABLE:
+        return tuple(_list_s3_tarballs(bucket, TARBALL_PREFIX))
+    return tuple(_list_page_tarballs(s3_bucket_url))
+
+
+def _tarball_cache_path():
+    cache_home = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "therock", "s3_latest.json")
+
+
+def _read_tarball_cache(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# URLs resolved or read from disk during this run, so repeated lookups of
+# the same bucket and pattern skip both the listing and the cache file
+_tarball_url_memo = {}
+
+
+def _cached_tarball_url(cache_key):
+    if cache_key in _tarball_url_memo:
+        return _tarball_url_memo[cache_key]
+    entry = _read_tarball_cache(_tarball_cache_path()).get(cache_key)
+    if entry and time.time() - entry["ts"] < TARBALL_CACHE_TTL:
+        _tarball_url_memo[cache_key] = entry["url"]
+        return entry["url"]
+    return None
+
+
+def _store_tarball_url(cache_key, url):
+    _tarball_url_memo[cache_key] = url
+    path = _tarball_cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Serialize concurrent writers; readers see either the old or new file
+        with open(f"{path}.lock", "w") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            entries = _read_tarball_cache(path)
+            entries[cache_key] = {"url": url, "ts": time.time()}
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"WARNING: Could not update tarball cache {path}: {e}")
+
+
+def get_latest_s3_tarball(s3_bucket_url: str, gpu_arch_pattern: str) -> str:
+    """
+    Get the latest tar.gz file path from S3 bucket matching the GPU architecture pattern.
+
+    Results are kept for the rest of the run and cached on disk (under
+    $XDG_CACHE_HOME/therock) for TARBALL_CACHE_TTL seconds.
+    Args:
+        s3_bucket_url: The S3 bucket URL (e.g., "https://therock-nightly-tarball.s3.amazonaws.com/")
+        gpu_arch_pattern: The GPU architecture pattern to match (e.g., "linux-gfx120X")
+    Returns:
+        str: The full URL to the latest tar.gz file, or empty string if not found or error
+    """
+    if not s3_bucket_url or not gpu_arch_pattern:
+        print("ERROR: Both s3_bucket_url and gpu_arch_pattern are required")
+        return ""
+
+    cache_key = f"{s3_bucket_url}|{gpu_arch_pattern}"
+    cached_url = _cached_tarball_url(cache_key)
+    if cached_url:
+        print(f"Latest tarball for {gpu_arch_pattern} (cached): {cached_url}")
+        return cached_url
+
+    print("GPU pattern before removing suffix: ", gpu_arch_pattern)
+    gpu_arch_pattern_base = gpu_arch_pattern.split("_")[0]  # Use only the part before underscore
+    print("GPU pattern after removing suffix: ", gpu_arch_pattern_base)
+    
+    # Add therock-dist- prefix only for rocm.nightlies.amd.com bucket
+    if "rocm.nightlies.amd.com" in s3_bucket_url:
+        search_pattern = f"therock-dist-{gpu_arch_pattern_base}"
+    else:
+        search_pattern = gpu_arch_pattern_base
+    
+    print(f"Searching for latest tarball in {s3_bucket_url} matching pattern {search_pattern}")
+
+    listing_errors = (OSError,)
+    if s3_bucket_name(s3_bucket_url) and BOTO3_AVAILABLE:
+        from botocore.exceptions import BotoCoreError, ClientError
+        listing_errors += (BotoCoreError, ClientError)
+
+    try:
+        tarballs = _bucket_tarballs(s3_bucket_url)
+    except listing_errors as e:
+        print(f"ERROR: Failed to get S3 bucket listing: {e}")
+        return ""
+    latest = max(
+        (tarball for tarball in tarballs if search_pattern in tarball.name),
+        key=lambda tarball: tarball_sort_key(tarball.name),
+        default=None,
+    )
+
+    if latest is None:
+        print(f"ERROR: No tar.gz file found matching pattern '{search_pattern}'")
+        return ""
+    latest_filename = latest.name
+
+    # Construct the full URL
+    # Ensure s3_bucket_url ends with / and filename doesn't start with /
+    base_url = s3_bucket_url.rstrip("/")
+    filename = latest_filename.lstrip("/")
+    full_url = f"{base_url}/{filename}"
+
+    print(f"Latest tarball found: {latest_filename}")
+    if latest.size is not None:
+        print(f"Size: {latest.size} bytes, last modified: {latest.last_modified}, ETag: {latest.etag}")
+    print(f"Full URL: {full_url}")
+
+    _store_tarball_url(cache_key, full_url)
+    return full_url
+
+def main():
+    parser = argparse.ArgumentParser(description="Send TheRock pipeline completion notifications")
+    parser.add_argument("--receiver", required=True, help="Receiver email address (comma-separated for several)")
+    parser.add_argument("--status", required=True, choices=["success", "failure", "warning"], 
+                       help="Pipeline status")
+    parser.add_argument("--workflow-url", help="URL to the GitHub workflow run")
+    parser.add_argument("--failed-jobs", help="Comma-separated list of failed jobs")
+    parser.add_argument("--details", help="Additional details about the pipeline")
+    
+    # Email configuration
+    parser.add_argument("--sender-email-pass", help="Sender email app password for authentication")
+    parser.add_argument("--sender-email", required=True, 
+                       help="Sender email address")
+    parser.add_argument("--platform", default="linux", 
+                       help="Chose platform: windows or linux.")
+    parser.add_argument("--commit-id", help="GitHub commit SHA")
+    parser.add_argument("--max-per-conn", type=int, default=DEFAULT_MAX_PER_CONN,
+                       help=f"Messages sent per SMTP connection before reconnecting (default: {DEFAULT_MAX_PER_CONN})")
+    parser.add_argument("--abort-threshold", type=float, default=DEFAULT_ABORT_THRESHOLD,
+                       help=f"Abort a batch once this fraction of it (and at least {ABORT_MIN_FAILURES} emails) fails (default: 1/3)")
+    
+    parser.add_argument("--concurrent", action="store_true",
+                       help="Run the --workers connections on one asyncio event loop instead of threads (requires aiosmtplib); "
+                            "--max-per-conn, --abort-threshold and retries of 4xx replies do not apply")
+    parser.add_argument("--workers", type=int, default=1,
+                       help=f"Send over this many SMTP connections in parallel (max {MAX_POOL_SIZE}, default: 1)")
+    parser.add_argument("--dry-run", action="store_true",
+                       help="Print the rendered emails without connecting to SMTP")
+    parser.add_argument("--force", action="store_true",
+                       help=f"Send pipeline success notifications for refs other than {NOTIFY_REF} too")
+
+    # Legacy support
+    parser.add_argument("--subject", help="Email subject (legacy mode)")
+    parser.add_argument("--body", help="Email body (legacy mode)")
+    
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    
+    receivers = []
+    for receiver in (r.strip() for r in args.receiver.split(",")):
+        if not receiver:
+            continue
+        if receiver in receivers:
+            # Every receiver gets the same emails, so a repeat would only duplicate them
+            print(f"WARNING: Skipping duplicate receiver {receiver}")
+            continue
+        receivers.append(receiver)
+    if not receivers:
+        parser.error("--receiver lists no addresses")
+
+    if args.subject and args.body:
+        # Legacy mode
+        emails = [("legacy", args.subject, args.body)]
+    else:
+        # Success notifications are only wanted for the main branch; skip them
+        # for adhoc and PR runs before doing any S3 or SMTP work
+        ref = os.getenv("GITHUB_REF", NOTIFY_REF)
+        if args.status == "success" and ref != NOTIFY_REF and not (args.force or args.dry_run):
+            print(f"Skipping success notification for {ref}; pass --force to send it anyway")
+            return
+
+        # Pipeline notification mode; the emails are the same for every receiver
+        emails = build_pipeline_emails(
+            status=args.status,
+            workflow_url=args.workflow_url,
+            failed_jobs=args.failed_jobs,
+            details=args.details,
+            platform=args.platform,
+            commit_id=args.commit_id
+        )
+
+    if args.dry_run:
+        print_emails(emails)
+        return
+
+    sender_email, sender_password = resolve_sender(args.sender_email, args.sender_email_pass)
+
+    size = min(args.workers, MAX_POOL_SIZE)
+    if args.concurrent:
+        if AIOSMTPLIB_AVAILABLE:
+            if not send_emails_concurrently(receivers, emails, sender_email, sender_password, size):
+                sys.exit(1)
+            return
+        print("WARNING: --concurrent requires aiosmtplib (pip install aiosmtplib); using threads")
+
+    if size > 1:
+        with SMTPSessionPool(sender_email, sender_password, size, args.max_per_conn) as pool:
+            failed = send_emails_pooled(receivers, emails, pool, args.abort_threshold)
+        if failed:
+            sys.exit(1)
+        return
+
+    # One SMTP connection, and one send per email with every receiver as a recipient
+    with SMTPSession(sender_email, sender_password, max_per_conn=args.max_per_conn) as session:
+        failed = send_emails(receivers, emails, session, args.abort_threshold)
+    if failed:
+        sys.exit(1)
+
+# Example usage:
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main()
+    else:
+        print("Usage: python sent_email.py --receiver EMAIL --status STATUS --sender-email EMAIL [options]")
+        print("Use --help for more information.")
+        sys.exit(1)
+
+
+
@@ -0,0 +1,62 @@
+"""Finding TheRock release tarballs in S3 bucket and nightly index listings.
+
+Shared by the scripts that look up the latest SDK tarball for a GPU family
+(.github/sent_email.py and build_tools/trigger_orchestrai.py).
+"""
+
+import re
+import urllib.parse
+from typing import Iterable, Iterator, Optional
+
+# Release tarballs are uploaded as therock-dist-<platform>-<family>-<version>.tar.gz
+TARBALL_PREFIX = "therock-dist-"
+
+# YYYYMMDD build date embedded in tarball names, e.g. 7.10.0a20251113 or 7.9.0rc20251008
+DATE_RE = re.compile(r"[0-9]{8}")
+
+# Bytes read per chunk when streaming a listing
+LISTING_CHUNK_SIZE = 64 * 1024
+# Upper bound on one name plus its markup, kept between chunks so that names
+# split across a chunk boundary are still matched
+LISTING_CARRY_SIZE = 2048
+
+# Tarball names in an S3 XML listing (<Key>...</Key>) or a
+# rocm.nightlies.amd.com index ("name": "..."), matched on the raw bytes
+TARBALL_NAME_RE = re.compile(rb'<Key>([^<]*\.tar\.gz)</Key>|"name": "([^"]*\.tar\.gz)"')
+
+
+def is_release_tarball(name: str) -> bool:
+    """Return True for a .tar.gz name that is not an adhoc build."""
+    return name.endswith(".tar.gz") and "ADHOCBUILD" not in name
+
+
+def tarball_sort_key(name: str):
+    """Order tarball names by their YYYYMMDD build date, then by name."""
+    match = DATE_RE.search(name)
+    return (match.group() if match else "", name)
+
+
+def s3_bucket_name(url: str) -> Optional[str]:
+    """Return the bucket name of a virtual-hosted S3 URL, or None for other hosts."""
+    host = urllib.parse.urlparse(url).hostname or ""
+    if host.endswith(".s3.amazonaws.com"):
+        return host[: -len(".s3.amazonaws.com")]
+    return None
+
+
+def scan_tarball_names(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Yield the release tarball names in a listing given as byte chunks.
+
+    Only the unscanned tail of the listing is kept between chunks, so memory
+    use does not grow with the size of the bucket.
+    """
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        last_end = 0
+        for match in TARBALL_NAME_RE.finditer(buffer):
+            last_end = match.end()
+            name = (match.group(1) or match.group(2)).decode()
+            if "ADHOCBUILD" not in name:
+                yield name
+        buffer = buffer[max(last_end, len(buffer) - LISTING_CARRY_SIZE) :]
@@ -1,10 +1,40 @@
+import concurrent.futures
+import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 from pathlib import Path
 import argparse
+import time
+
+try:
+    # orjson parses the large item and log listings several times faster
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Log lookups or attachment downloads in flight at once; each is one GET to
+# the same host
+DEFAULT_CONCURRENCY = 8
+# Keep-alive connections kept open to the ReportPortal host; at least as many
+# as there are concurrent requests so none of them has to reconnect
+HTTP_POOL_SIZE = 32
+# Read and write attachments in large chunks to keep the copy loop short
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Items requested per page; ReportPortal caps page.size at 300, and servers
+# configured lower reject larger pages with a 400, so those fall back to 100
+ITEM_PAGE_SIZE = 300
+FALLBACK_ITEM_PAGE_SIZE = 100
+# Default location and lifetime of --use-cache item listings
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "rp_logs")
+ITEM_CACHE_TTL = 60 * 60
+# Item types that carry test output; suites and other containers are skipped
+LOG_ITEM_TYPES = ("TEST", "STEP")
 
 class ReportPortalDownloader:
-    def __init__(self, base_url, project_name, api_token):
+    def __init__(self, base_url, project_name, api_token, cache_dir=None):
         """
         Initialize ReportPortal connection
 
@@ -12,7 +42,10 @@ class ReportPortalDownloader:
             base_url: ReportPortal URL (e.g., 'http://ucicd-reports-uat.amd.com:8080')
             project_name: Your project name in ReportPortal
             api_token: Your API token from ReportPortal user profile
+            cache_dir: If set, launch item listings are kept here and reused
+                for ITEM_CACHE_TTL seconds
         """
+        self.cache_dir = cache_dir
         self.base_url = base_url.rstrip('/')
         self.project_name = project_name
         self.api_url = f"{self.base_url}/api/v1/{project_name}"
@@ -22,9 +55,27 @@ class ReportPortalDownloader:
         }
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        # Everything goes to one host; retry transient gateway errors with backoff
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=HTTP_POOL_SIZE,
+            max_retries=Retry(total=5, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Launches looked up so far, keyed by ("name", name) or ("id", id)
+        self._launch_cache = {}
+        # Number of the get_logs_for_item() method that last succeeded
+        self._log_method = None
+        # Output directories already created, so each is only made once
+        self._dirs_ready = set()
 
     def get_launch_by_name(self, launch_name):
-        """Get the most recent launch by name"""
+        """Get the most recent launch by name (cached per downloader)"""
+        key = ("name", launch_name)
+        if key in self._launch_cache:
+            return self._launch_cache[key]
+
         url = f"{self.api_url}/launch"
         params = {
             "filter.eq.name": launch_name,
@@ -34,131 +85,196 @@ class ReportPortalDownloader:
 
         response = self.session.get(url, params=params)
         response.raise_for_status()
-        data = response.json()
+        data = _json_loads(response.content)
 
         content = data.get("content", [])
         if not content:
             raise Exception(f"No launch found with name: {launch_name}")
 
+        self._launch_cache[key] = content[0]
         return content[0]
 
     def get_launch_by_id(self, launch_id):
-        """Get launch details by ID"""
-        url = f"{self.api_url}/launch/{launch_id}"
-        response = self.session.get(url)
-        response.raise_for_status()
-        return response.json()
+        """Get launch details by ID (cached per downloader)"""
+        key = ("id", str(launch_id))
+        if key not in self._launch_cache:
+            url = f"{self.api_url}/launch/{launch_id}"
+            response = self.session.get(url)
+            response.raise_for_status()
+            self._launch_cache[key] = _json_loads(response.content)
+        return self._launch_cache[key]
 
-    def get_test_items(self, launch_id, parent_id=None):
-        """Get all test items for a launch (recursively)"""
-        all_items = []
-        page = 1
-        page_size = 100
-
-        while True:
-            url = f"{self.api_url}/item"
-            params = {
-                "filter.eq.launchId": launch_id,
-                "page.page": page,
-                "page.size": page_size,
-                "isLatest": False,
-                "launchesLimit": 0
-            }
+    def _get_item_page(self, launch_id, parent_id, page, page_size, item_types=None):
+        """Get one page of test items"""
+        url = f"{self.api_url}/item"
+        params = {
+            "filter.eq.launchId": launch_id,
+            "page.page": page,
+            "page.size": page_size,
+            "isLatest": False,
+            "launchesLimit": 0
+        }
 
-            if parent_id:
-                params["filter.eq.parentId"] = parent_id
+        if parent_id:
+            params["filter.eq.parentId"] = parent_id
+        if item_types:
+            params["filter.in.type"] = ",".join(item_types)
 
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+        response = self.session.get(url, params=params)
+        response.raise_for_status()
+        return _json_loads(response.content)
 
-            items = data.get("content", [])
-            all_items.extend(items)
+    def get_test_items(self, launch_id, parent_id=None, item_types=None):
+        """
+        Get all test items for a launch
 
-            # Recursively get child items
-            for item in items:
-                if item.get("hasChildren", False):
-                    child_items = self.get_test_items(launch_id, item["id"])
-                    all_items.extend(child_items)
+        The launchId listing already includes items at every level, so child
+        items are not fetched per parent. With item_types, the server only
+        returns items of those types.
+        """
+        all_items = []
+        page_size = ITEM_PAGE_SIZE
 
-            # Check if there are more pages
-            if len(items) < page_size:
-                break
+        try:
+            data = self._get_item_page(launch_id, parent_id, 1, page_size, item_types)
+        except requests.exceptions.HTTPError as e:
+            if e.response is None or e.response.status_code != 400:
+                raise
+            page_size = FALLBACK_ITEM_PAGE_SIZE
+            data = self._get_item_page(launch_id, parent_id, 1, page_size, item_types)
+        # The first page reports how many there are, so the rest are requested
+        # together rather than one after another
+        total_pages = data.get("page", {}).get("totalPages")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=DEFAULT_CONCURRENCY) as executor:
+            if total_pages:
+                later_pages = [
+                    executor.submit(self._get_item_page, launch_id, parent_id, page, page_size, item_types)
+                    for page in range(2, total_pages + 1)
+                ]
+            else:
+                later_pages = []
+            page = 1
 
-            page += 1
+            while True:
+                items = data.get("content", [])
+                all_items.extend(items)
 
-        return all_items
+                if later_pages:
+                    data = later_pages.pop(0).result()
+                    continue
 
-    def get_logs_for_item(self, item_id, debug=False):
-        """Get all logs for a test item"""
-        all_logs = []
+                # Check if there are more pages
+                if total_pages or len(items) < page_size:
+                    break
 
-        # Method 1: Try direct endpoint
-        try:
-            url = f"{self.api_url}/item/{item_id}/log"
-            if debug:
-                print(f"    [DEBUG] Trying URL: {url}")
+                page += 1
+                data = self._get_item_page(launch_id, parent_id, page, page_size, item_types)
 
-            response = self.session.get(url)
-            response.raise_for_status()
-            data = response.json()
+        # An item can show up on two pages if the launch changes while it is
+        # listed; keep the first copy
+        seen = set()
+        return [item for item in all_items if not (item["id"] in seen or seen.add(item["id"]))]
 
-            logs = data.get("content", [])
-            if debug:
-                print(f"    [DEBUG] Method 1 (item/log) returned {len(logs)} logs")
+    def get_cached_test_items(self, launch_id, item_types=None):
+        """Get all test items for a launch, reusing a recent listing from cache_dir"""
+        if not self.cache_dir:
+            return self.get_test_items(launch_id, item_types=item_types)
 
-            if logs:
-                return logs
+        types_suffix = f"-{'_'.join(item_types)}" if item_types else ""
+        cache_path = Path(self.cache_dir) / f"{self.project_name}-{launch_id}{types_suffix}.json"
+        try:
+            if time.time() - cache_path.stat().st_mtime < ITEM_CACHE_TTL:
+                items = _json_loads(cache_path.read_bytes())
+                print(f"Using cached item listing {cache_path}")
+                return items
+        except (OSError, ValueError):
+            pass
+
+        items = self.get_test_items(launch_id, item_types=item_types)
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(items))
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"WARNING: Could not write item cache {cache_path}: {e}")
+        return items
+
+    def _get_logs_by_item_path(self, item_id, debug=False):
+        """Method 1: direct item/log endpoint"""
+        url = f"{self.api_url}/item/{item_id}/log"
+        if debug:
+            print(f"    [DEBUG] Trying URL: {url}")
 
-        except requests.exceptions.RequestException as e:
-            if debug:
-                print(f"    [DEBUG] Method 1 failed: {e}")
+        response = self.session.get(url)
+        response.raise_for_status()
+        data = _json_loads(response.content)
 
-        # Method 2: Try log endpoint with filter
-        try:
-            url = f"{self.api_url}/log"
-            params = {
-                "filter.eq.item": item_id
-            }
-            if debug:
-                print(f"    [DEBUG] Trying URL: {url} with params: {params}")
+        logs = data.get("content", [])
+        if debug:
+            print(f"    [DEBUG] Method 1 (item/log) returned {len(logs)} logs")
+        return logs
 
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+    def _get_logs_by_filter(self, item_id, debug=False):
+        """Method 2: log endpoint filtered by item"""
+        url = f"{self.api_url}/log"
+        params = {
+            "filter.eq.item": item_id
+        }
+        if debug:
+            print(f"    [DEBUG] Trying URL: {url} with params: {params}")
 
-            logs = data.get("content", [])
-            if debug:
-                print(f"    [DEBUG] Method 2 (log with filter) returned {len(logs)} logs")
+        response = self.session.get(url, params=params)
+        response.raise_for_status()
+        data = _json_loads(response.content)
 
-            if logs:
-                return logs
+        logs = data.get("content", [])
+        if debug:
+            print(f"    [DEBUG] Method 2 (log with filter) returned {len(logs)} logs")
+        return logs
 
-        except requests.exceptions.RequestException as e:
-            if debug:
-                print(f"    [DEBUG] Method 2 failed: {e}")
+    def _get_log_by_uuid(self, item_id, debug=False):
+        """Method 3: UUID in path"""
+        url = f"{self.api_url}/log/uuid/{item_id}"
+        if debug:
+            print(f"    [DEBUG] Trying URL: {url}")
 
-        # Method 3: Try with UUID in path
-        try:
-            url = f"{self.api_url}/log/uuid/{item_id}"
-            if debug:
-                print(f"    [DEBUG] Trying URL: {url}")
+        response = self.session.get(url)
+        response.raise_for_status()
+        logs = [_json_loads(response.content)]  # Single log object
 
-            response = self.session.get(url)
-            response.raise_for_status()
-            logs = [response.json()]  # Single log object
+        if debug:
+            print(f"    [DEBUG] Method 3 (uuid path) returned {len(logs)} logs")
+        return logs
 
-            if debug:
-                print(f"    [DEBUG] Method 3 (uuid path) returned {len(logs)} logs")
+    def get_logs_for_item(self, item_id, debug=False):
+        """
+        Get all logs for a test item
 
-            if logs:
-                return logs
+        The lookup methods are tried in turn until one succeeds; an empty list
+        from a working endpoint means the item has no logs. The method that
+        last succeeded is tried first, as the working endpoint is the same for
+        every item on a given server.
+        """
+        methods = [
+            (1, self._get_logs_by_item_path),
+            (2, self._get_logs_by_filter),
+            (3, self._get_log_by_uuid),
+        ]
+        methods.sort(key=lambda method: method[0] != self._log_method)
+
+        for number, method in methods:
+            try:
+                logs = method(item_id, debug=debug)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                if debug:
+                    print(f"    [DEBUG] Method {number} failed: {e}")
+                continue
 
-        except requests.exceptions.RequestException as e:
-            if debug:
-                print(f"    [DEBUG] Method 3 failed: {e}")
+            self._log_method = number
+            return logs
 
-        return all_logs
+        return []
 
     def download_log_file(self, binary_content_id, output_path, log_id=None, debug=False):
         """Download a log file attachment using binary content ID"""
@@ -178,12 +294,18 @@ class ReportPortalDownloader:
 
             # Create directory if it doesn't exist
             output_dir = os.path.dirname(output_path)
-            if output_dir:
+            if output_dir and output_dir not in self._dirs_ready:
                 os.makedirs(output_dir, exist_ok=True)
+                self._dirs_ready.add(output_dir)
 
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            # Attachments smaller than a chunk are read and written in one go
+            content_length = response.headers.get("Content-Length")
+            if content_length and int(content_length) < DOWNLOAD_CHUNK_SIZE:
+                Path(output_path).write_bytes(response.content)
+            else:
+                with open(output_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
 
             # Check if file has content (not empty)
             file_size = os.path.getsize(output_path)
@@ -201,7 +323,28 @@ class ReportPortalDownloader:
                 print(f"    [DEBUG] Failed: {e}")
             raise e
 
-    def download_stdout_logs(self, launch_id=None, launch_name=None, output_dir="downloads", debug=False, max_items=None):
+    def download_log_files(self, downloads, concurrency=DEFAULT_CONCURRENCY, debug=False):
+        """
+        Download attachments concurrently
+
+        Args:
+            downloads: List of (binary_content_id, output_path, log_id) tuples
+            concurrency: Number of downloads in flight at once
+            debug: If True, print request details for each download
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {
+                executor.submit(self.download_log_file, binary_id, output_path, log_id=log_id, debug=debug): binary_id
+                for binary_id, output_path, log_id in downloads
+            }
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"  ❌ Error downloading attachment {futures[future]}: {e}")
+
+    def download_stdout_logs(self, launch_id=None, launch_name=None, output_dir="downloads", debug=False, max_items=None,
+                             concurrency=DEFAULT_CONCURRENCY, item_types=LOG_ITEM_TYPES):
         """
         Download all stdout.log files for a launch
 
@@ -211,6 +354,8 @@ class ReportPortalDownloader:
             output_dir: Directory to save downloaded files
             debug: If True, print detailed log structure for debugging
             max_items: If set, only process this many test items (for testing)
+            concurrency: Number of log lookups or downloads in flight at once
+            item_types: Only look for logs on items of these types (None for all items)
         """
         # Get launch info by ID or name
         if launch_name:
@@ -228,8 +373,11 @@ class ReportPortalDownloader:
         print(f"Launch: {launch_name}")
         print(f"Fetching test items...")
 
-        test_items = self.get_test_items(launch_id)
-        print(f"Found {len(test_items)} test items")
+        test_items = self.get_cached_test_items(launch_id, item_types=item_types)
+        if item_types:
+            print(f"Found {len(test_items)} test items of type {', '.join(item_types)}")
+        else:
+            print(f"Found {len(test_items)} test items")
 
         # Limit items if max_items is set (for testing)
         if max_items and len(test_items) > max_items:
@@ -237,8 +385,17 @@ class ReportPortalDownloader:
             test_items = test_items[:max_items]
 
         stdout_count = 0
+        # Attachments are collected here and fetched together once every item is scanned
+        downloads = []
+
+        # Look up every item's logs concurrently, then go through them in item order
+        with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+            log_futures = [
+                executor.submit(self.get_logs_for_item, item["id"], debug=debug and idx <= 3)
+                for idx, item in enumerate(test_items, 1)
+            ]
 
-        for idx, item in enumerate(test_items, 1):
+        for idx, (item, log_future) in enumerate(zip(test_items, log_futures), 1):
             item_id = item["id"]
             item_name = item.get("name", "unknown")
             item_type = item.get("type", "unknown")
@@ -246,13 +403,12 @@ class ReportPortalDownloader:
             print(f"\n[{idx}/{len(test_items)}] Checking logs for: {item_name} (type: {item_type}, id: {item_id})")
 
             try:
-                logs = self.get_logs_for_item(item_id, debug=debug and idx <= 3)
+                logs = log_future.result()
                 print(f"  Found {len(logs)} log entries")
 
                 for log in logs:
                     # Debug mode: print full log structure for first few logs
                     if debug and idx <= 3:
-                        import json
                         print(f"\n  === DEBUG: Full log structure ===")
                         print(json.dumps(log, indent=2, default=str))
                         print(f"  === END DEBUG ===\n")
@@ -274,19 +430,10 @@ class ReportPortalDownloader:
                         # Debug: print all attachments
                         print(f"  - Found attachment: '{filename}' | Message: '{log_message[:100]}'")
 
-                        # Check if this is an actual file attachment (not just a log message reference)
-                        # Look for messages like "[result] Attachment: attachments/XXX_stdout.txt"
-                        is_stdout = False
-                        is_real_attachment = False
-
-                        # Check if message indicates this is an actual file attachment
-                        if "[result] Attachment:" in log_message or "[upload " in log_message:
-                            is_real_attachment = True
-                            # Now check if it's a stdout file
-                            if "stdout" in log_message.lower():
-                                is_stdout = True
-
-                        if is_stdout and is_real_attachment:
+                        # Check if this is an actual stdout file attachment (not just a log message
+                        # reference), e.g. "[result] Attachment: attachments/XXX_stdout.txt"
+                        is_real_attachment = "[result] Attachment:" in log_message or "[upload " in log_message
+                        if is_real_attachment and "stdout" in log_message.lower():
                             stdout_count += 1
                             print(f"  ✓ Found stdout.log!")
 
@@ -295,15 +442,12 @@ class ReportPortalDownloader:
                             output_filename = f"{safe_item_name}_{stdout_count}_stdout.log"
                             output_path = os.path.join(output_dir, launch_name, output_filename)
 
-                            try:
-                                # Use the binary content ID to download
-                                binary_id = binary_content.get("id")
-                                if binary_id:
-                                    self.download_log_file(binary_id, output_path, log_id=log.get("id"), debug=debug)
-                                else:
-                                    print(f"  ❌ No binary content ID found for log {log['id']}")
-                            except Exception as e:
-                                print(f"  ❌ Error downloading attachment {binary_id}: {e}")
+                            # Use the binary content ID to download
+                            binary_id = binary_content.get("id")
+                            if binary_id:
+                                downloads.append((binary_id, output_path, log.get("id")))
+                            else:
+                                print(f"  ❌ No binary content ID found for log {log['id']}")
                     elif debug and not log.get("binaryContent"):
                         # In debug mode, show logs without attachments too
                         print(f"  - No attachment | Message: '{log_message[:150]}'")
@@ -311,6 +455,14 @@ class ReportPortalDownloader:
                 print(f"  ⚠️  Could not get logs for item {item_id}: {e}")
                 continue
 
+        if downloads:
+            print(f"\nDownloading {len(downloads)} attachments...")
+            # Every attachment goes to the same directory; create it once up front
+            target_dir = os.path.join(output_dir, launch_name)
+            os.makedirs(target_dir, exist_ok=True)
+            self._dirs_ready.add(target_dir)
+            self.download_log_files(downloads, concurrency, debug=debug)
+
         print(f"\n✅ Downloaded {stdout_count} stdout.log files to {output_dir}/{launch_name}/")
         return stdout_count
 
@@ -362,6 +514,30 @@ Examples:
         type=int,
         help='Limit number of test items to process (for testing)'
     )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f'Number of log lookups or downloads to run at once (default: {DEFAULT_CONCURRENCY})'
+    )
+    parser.add_argument(
+        '--item-types',
+        type=str,
+        default=",".join(LOG_ITEM_TYPES),
+        help=f'Comma-separated item types to check for logs, or "all" (default: {",".join(LOG_ITEM_TYPES)})'
+    )
+
+    parser.add_argument(
+        '--use-cache',
+        action='store_true',
+        help=f'Reuse item listings fetched in the last {ITEM_CACHE_TTL // 60} minutes (for repeated runs on one launch)'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=DEFAULT_CACHE_DIR,
+        help=f'Directory for --use-cache item listings (default: {DEFAULT_CACHE_DIR})'
+    )
 
     args = parser.parse_args()
 
@@ -372,6 +548,16 @@ Examples:
     if args.launch_name and args.launch_id:
         parser.error("Cannot specify both --launch-name and --launch-id")
 
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    # Item types are upper case on the server; accept "TEST, step" too
+    item_types = tuple(t.strip().upper() for t in args.item_types.split(",") if t.strip())
+    if not item_types:
+        parser.error("--item-types must name at least one type, or \"all\"")
+    if item_types == ("ALL",):
+        item_types = None
+
     # Configuration - prefer environment variables, fall back to defaults
     REPORT_PORTAL_URL = os.getenv("REPORT_PORTAL_URL", "http://ucicd-reports-uat.amd.com:8080")
     PROJECT_NAME = os.getenv("REPORT_PORTAL_PROJECT", "ucicd_project_slim")
@@ -386,7 +572,8 @@ Examples:
     downloader = ReportPortalDownloader(
         base_url=REPORT_PORTAL_URL,
         project_name=PROJECT_NAME,
-        api_token=API_TOKEN
+        api_token=API_TOKEN,
+        cache_dir=args.cache_dir if args.use_cache else None
     )
 
     # Download all stdout.log files
@@ -396,7 +583,9 @@ Examples:
             launch_name=args.launch_name,
             output_dir=args.output,
             debug=args.debug,
-            max_items=args.max_items
+            max_items=args.max_items,
+            concurrency=args.concurrency,
+            item_types=item_types
         )
     except requests.exceptions.RequestException as e:
         print(f"Error: {e}")
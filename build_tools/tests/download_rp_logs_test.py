@@ -0,0 +1,150 @@
+from pathlib import Path
+import os
+import sys
+import unittest
+from unittest.mock import Mock, patch
+
+import requests
+
+sys.path.insert(0, os.fspath(Path(__file__).parent.parent))
+
+from download_rp_logs import (
+    FALLBACK_ITEM_PAGE_SIZE,
+    ITEM_PAGE_SIZE,
+    ReportPortalDownloader,
+)
+
+
+def make_page(ids, total_pages=None):
+    data = {"content": [{"id": i} for i in ids]}
+    if total_pages is not None:
+        data["page"] = {"totalPages": total_pages}
+    return data
+
+
+def http_error(status_code):
+    return requests.exceptions.HTTPError(response=Mock(status_code=status_code))
+
+
+class GetTestItemsTest(unittest.TestCase):
+    def setUp(self):
+        self.downloader = ReportPortalDownloader("http://rp", "proj", "token")
+
+    def testPrefetchesPagesFromTotalPages(self):
+        pages = {1: make_page([1, 2], 3), 2: make_page([3, 4], 3), 3: make_page([5], 3)}
+        with patch.object(
+            self.downloader,
+            "_get_item_page",
+            side_effect=lambda launch_id, parent_id, page, size, types: pages[page],
+        ) as get_page:
+            items = self.downloader.get_test_items(7)
+
+        self.assertEqual([item["id"] for item in items], [1, 2, 3, 4, 5])
+        self.assertEqual(
+            sorted(call.args[2] for call in get_page.call_args_list), [1, 2, 3]
+        )
+        for call in get_page.call_args_list:
+            self.assertEqual(call.args[3], ITEM_PAGE_SIZE)
+
+    def testPagesUntilShortPageWithoutTotalPages(self):
+        pages = {
+            1: make_page(range(ITEM_PAGE_SIZE)),
+            2: make_page(range(ITEM_PAGE_SIZE, ITEM_PAGE_SIZE + 1)),
+        }
+        with patch.object(
+            self.downloader,
+            "_get_item_page",
+            side_effect=lambda launch_id, parent_id, page, size, types: pages[page],
+        ) as get_page:
+            items = self.downloader.get_test_items(7)
+
+        self.assertEqual(len(items), ITEM_PAGE_SIZE + 1)
+        self.assertEqual([call.args[2] for call in get_page.call_args_list], [1, 2])
+
+    def testFallsBackToSmallerPagesOn400(self):
+        def get_page(launch_id, parent_id, page, size, types):
+            if size > FALLBACK_ITEM_PAGE_SIZE:
+                raise http_error(400)
+            return make_page([page], 2)
+
+        with patch.object(
+            self.downloader, "_get_item_page", side_effect=get_page
+        ) as mock_get_page:
+            items = self.downloader.get_test_items(7)
+
+        self.assertEqual([item["id"] for item in items], [1, 2])
+        self.assertEqual(
+            [call.args[3] for call in mock_get_page.call_args_list],
+            [ITEM_PAGE_SIZE, FALLBACK_ITEM_PAGE_SIZE, FALLBACK_ITEM_PAGE_SIZE],
+        )
+
+    def testOtherHttpErrorsPropagate(self):
+        with patch.object(
+            self.downloader, "_get_item_page", side_effect=http_error(500)
+        ):
+            with self.assertRaises(requests.exceptions.HTTPError):
+                self.downloader.get_test_items(7)
+
+    def testDropsDuplicateIds(self):
+        pages = {1: make_page([1, 2], 2), 2: make_page([2, 3], 2)}
+        with patch.object(
+            self.downloader,
+            "_get_item_page",
+            side_effect=lambda launch_id, parent_id, page, size, types: pages[page],
+        ):
+            items = self.downloader.get_test_items(7)
+
+        self.assertEqual([item["id"] for item in items], [1, 2, 3])
+
+
+class GetLogsForItemTest(unittest.TestCase):
+    def setUp(self):
+        self.downloader = ReportPortalDownloader("http://rp", "proj", "token")
+        self.by_path = patch.object(self.downloader, "_get_logs_by_item_path").start()
+        self.by_filter = patch.object(self.downloader, "_get_logs_by_filter").start()
+        self.by_uuid = patch.object(self.downloader, "_get_log_by_uuid").start()
+        self.addCleanup(patch.stopall)
+
+    def testFallsThroughFailingMethodsInOrder(self):
+        self.by_path.side_effect = http_error(404)
+        self.by_filter.side_effect = ValueError("not JSON")
+        self.by_uuid.return_value = [{"id": 1}]
+
+        calls = Mock()
+        calls.attach_mock(self.by_path, "by_path")
+        calls.attach_mock(self.by_filter, "by_filter")
+        calls.attach_mock(self.by_uuid, "by_uuid")
+
+        self.assertEqual(self.downloader.get_logs_for_item(5), [{"id": 1}])
+        self.assertEqual(
+            [call[0] for call in calls.mock_calls], ["by_path", "by_filter", "by_uuid"]
+        )
+
+    def testRemembersWorkingMethod(self):
+        self.by_path.side_effect = http_error(404)
+        self.by_filter.return_value = [{"id": 1}]
+
+        self.downloader.get_logs_for_item(5)
+        self.downloader.get_logs_for_item(6)
+
+        self.by_path.assert_called_once()
+        self.assertEqual(self.by_filter.call_count, 2)
+        self.by_uuid.assert_not_called()
+
+    def testEmptyListIsFinal(self):
+        self.by_path.return_value = []
+
+        self.assertEqual(self.downloader.get_logs_for_item(5), [])
+        self.by_filter.assert_not_called()
+        self.by_uuid.assert_not_called()
+
+    def testAllMethodsFailing(self):
+        self.by_path.side_effect = http_error(404)
+        self.by_filter.side_effect = http_error(404)
+        self.by_uuid.side_effect = requests.exceptions.ConnectionError()
+
+        self.assertEqual(self.downloader.get_logs_for_item(5), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
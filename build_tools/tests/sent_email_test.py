@@ -0,0 +1,105 @@
+from pathlib import Path
+import importlib.util
+import io
+import smtplib
+import sys
+import unittest
+from unittest.mock import patch
+
+THIS_DIR = Path(__file__).resolve().parent
+REPO_DIR = THIS_DIR.parent.parent
+
+# sent_email.py lives under .github/ rather than on a package path
+_spec = importlib.util.spec_from_file_location(
+    "sent_email", REPO_DIR / ".github" / "sent_email.py"
+)
+sent_email = importlib.util.module_from_spec(_spec)
+sys.modules["sent_email"] = sent_email
+_spec.loader.exec_module(sent_email)
+
+
+class TemporaryRejectionTest(unittest.TestCase):
+    def testRecipientsRefused(self):
+        self.assertTrue(
+            sent_email._is_temporary_rejection(
+                smtplib.SMTPRecipientsRefused(
+                    {"a@x.com": (450, b"busy"), "b@x.com": (421, b"later")}
+                )
+            )
+        )
+        self.assertFalse(
+            sent_email._is_temporary_rejection(
+                smtplib.SMTPRecipientsRefused(
+                    {"a@x.com": (450, b"busy"), "b@x.com": (550, b"no such user")}
+                )
+            )
+        )
+
+    def testNoRecipientsIsNotTemporary(self):
+        self.assertFalse(
+            sent_email._is_temporary_rejection(smtplib.SMTPRecipientsRefused({}))
+        )
+
+    def testResponseCodes(self):
+        self.assertTrue(
+            sent_email._is_temporary_rejection(smtplib.SMTPDataError(451, b"try again"))
+        )
+        self.assertFalse(
+            sent_email._is_temporary_rejection(smtplib.SMTPDataError(554, b"spam"))
+        )
+        self.assertFalse(
+            sent_email._is_temporary_rejection(smtplib.SMTPServerDisconnected())
+        )
+
+
+class BuildMessageTest(unittest.TestCase):
+    def testReceiversAreNotDisclosed(self):
+        msg = sent_email.build_message("s@x.com", ["a@x.com", "b@x.com"], "S", "B")
+        headers = msg.split(b"\r\n\r\n", 1)[0]
+        self.assertIn(b"To: undisclosed-recipients:;\r\n", headers)
+        self.assertNotIn(b"a@x.com", headers)
+        self.assertNotIn(b"b@x.com", headers)
+
+    def testSingleReceiverIsNamed(self):
+        msg = sent_email.build_message("s@x.com", ["a@x.com"], "S", "B")
+        self.assertIn(b"To: a@x.com\r\n", msg)
+
+
+class ShouldAbortTest(unittest.TestCase):
+    def testNeedsMinimumFailures(self):
+        self.assertFalse(sent_email._should_abort(2, 2, 1 / 3))
+
+    def testNeedsMoreThanThreshold(self):
+        self.assertFalse(sent_email._should_abort(3, 9, 1 / 3))
+        self.assertTrue(sent_email._should_abort(4, 9, 1 / 3))
+        self.assertFalse(sent_email._should_abort(3, 100, 1 / 3))
+
+
+class ListPageTarballsTest(unittest.TestCase):
+    @patch("urllib.request.urlopen")
+    def testNamesSplitAcrossReads(self, mock_urlopen):
+        listing = (
+            b"<ListBucketResult>"
+            b"<Contents><Key>therock-dist-linux-gfx1151-7.10.0a20251112.tar.gz</Key></Contents>"
+            b"<Contents><Key>therock-dist-linux-gfx1151-ADHOCBUILD-7.tar.gz</Key></Contents>"
+            b"<Contents><Key>therock-dist-linux-gfx1151-7.10.0a20251112.tar.gz.sha256</Key></Contents>"
+            b"<Contents><Key>therock-dist-linux-gfx1151-7.10.0a20251113.tar.gz</Key></Contents>"
+            b"</ListBucketResult>"
+        )
+        mock_urlopen.return_value.__enter__.return_value = io.BytesIO(listing)
+
+        with patch.object(sent_email, "LISTING_CHUNK_SIZE", 16):
+            tarballs = list(sent_email._list_page_tarballs("https://bucket/"))
+
+        self.assertEqual(
+            [tarball.name for tarball in tarballs],
+            [
+                "therock-dist-linux-gfx1151-7.10.0a20251112.tar.gz",
+                "therock-dist-linux-gfx1151-7.10.0a20251113.tar.gz",
+            ],
+        )
+        self.assertIsNone(tarballs[0].size)
+
+
+if __name__ == "__main__":
+    unittest.main()
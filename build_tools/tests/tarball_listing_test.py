@@ -0,0 +1,80 @@
+from pathlib import Path
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.fspath(Path(__file__).parent.parent))
+
+from _therock_utils.tarball_listing import (
+    LISTING_CARRY_SIZE,
+    is_release_tarball,
+    s3_bucket_name,
+    scan_tarball_names,
+    tarball_sort_key,
+)
+
+
+class TarballNameTest(unittest.TestCase):
+    def testIsReleaseTarball(self):
+        self.assertTrue(
+            is_release_tarball("therock-dist-linux-gfx1151-7.10.0a20251113.tar.gz")
+        )
+        self.assertFalse(
+            is_release_tarball("therock-dist-linux-gfx1151-ADHOCBUILD-7.tar.gz")
+        )
+        self.assertFalse(
+            is_release_tarball(
+                "therock-dist-linux-gfx1151-7.10.0a20251113.tar.gz.sha256"
+            )
+        )
+
+    def testSortKeyOrdersByDateThenName(self):
+        names = [
+            "therock-dist-linux-gfx1151-7.10.0a20251114.tar.gz",
+            "therock-dist-linux-gfx1151-7.9.0rc20251201.tar.gz",
+            "therock-dist-linux-gfx1151-7.11.0a20251114.tar.gz",
+        ]
+        self.assertEqual(
+            sorted(names, key=tarball_sort_key),
+            [names[0], names[2], names[1]],
+        )
+
+    def testS3BucketName(self):
+        self.assertEqual(
+            s3_bucket_name("https://therock-nightly-tarball.s3.amazonaws.com/"),
+            "therock-nightly-tarball",
+        )
+        self.assertIsNone(s3_bucket_name("https://rocm.nightlies.amd.com/tarball/"))
+
+
+class ScanTarballNamesTest(unittest.TestCase):
+    def testNamesSplitAcrossChunks(self):
+        listing = (
+            b"<ListBucketResult>"
+            b"<Contents><Key>therock-dist-linux-gfx1151-7.10.0a20251112.tar.gz</Key></Contents>"
+            b"<Contents><Key>therock-dist-linux-gfx1151-ADHOCBUILD-7.tar.gz</Key></Contents>"
+            b"<Contents><Key>therock-dist-linux-gfx1151-7.10.0a20251112.tar.gz.sha256</Key></Contents>"
+            b"<Contents><Key>therock-dist-linux-gfx1151-7.10.0a20251113.tar.gz</Key></Contents>"
+            b"</ListBucketResult>"
+        )
+        expected = [
+            "therock-dist-linux-gfx1151-7.10.0a20251112.tar.gz",
+            "therock-dist-linux-gfx1151-7.10.0a20251113.tar.gz",
+        ]
+        # All but the whole-listing chunk size split names across boundaries
+        for size in (1, 7, 32, 100, len(listing)):
+            chunks = [listing[i : i + size] for i in range(0, len(listing), size)]
+            self.assertEqual(list(scan_tarball_names(chunks)), expected, size)
+
+    def testIndexNamesAfterLongGap(self):
+        # Unmatched markup longer than the carry is dropped between chunks
+        name = b'"name": "therock-dist-windows-gfx110X-all-7.10.0a20251113.tar.gz"'
+        chunks = [b"x" * (LISTING_CARRY_SIZE * 2), name[:20], name[20:]]
+        self.assertEqual(
+            list(scan_tarball_names(chunks)),
+            ["therock-dist-windows-gfx110X-all-7.10.0a20251113.tar.gz"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
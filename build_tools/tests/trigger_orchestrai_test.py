@@ -0,0 +1,93 @@
+from pathlib import Path
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.fspath(Path(__file__).parent.parent))
+
+from trigger_orchestrai import (
+    _list_s3_tarball_names,
+    pick_latest,
+)
+
+
+class ListS3TarballNamesTest(unittest.TestCase):
+    @patch("trigger_orchestrai._s3_client")
+    def testListsPrefixAndSkipsAdhocBuilds(self, mock_client):
+        paginator = mock_client.return_value.get_paginator.return_value
+        paginator.paginate.return_value = [
+            {
+                "Contents": [
+                    {"Key": "therock-dist-linux-gfx110X-all-7.10.0a20251112.tar.gz"},
+                    {"Key": "therock-dist-linux-gfx110X-all-ADHOCBUILD-1.tar.gz"},
+                ]
+            },
+            {
+                "Contents": [
+                    {
+                        "Key": "therock-dist-linux-gfx110X-all-7.10.0a20251112.tar.gz.sha256"
+                    }
+                ]
+            },
+            {},
+            {
+                "Contents": [
+                    {"Key": "therock-dist-windows-gfx1151-7.10.0a20251113.tar.gz"}
+                ]
+            },
+        ]
+
+        result = list(_list_s3_tarball_names("bucket", "therock-dist-"))
+
+        self.assertEqual(
+            result,
+            [
+                "therock-dist-linux-gfx110X-all-7.10.0a20251112.tar.gz",
+                "therock-dist-windows-gfx1151-7.10.0a20251113.tar.gz",
+            ],
+        )
+        mock_client.return_value.get_paginator.assert_called_once_with(
+            "list_objects_v2"
+        )
+        kwargs = paginator.paginate.call_args.kwargs
+        self.assertEqual(kwargs["Bucket"], "bucket")
+        self.assertEqual(kwargs["Prefix"], "therock-dist-")
+
+
+class PickLatestTest(unittest.TestCase):
+    def testPicksNewestDate(self):
+        names = [
+            "therock-dist-linux-gfx120X-all-7.10.0a20251113.tar.gz",
+            "therock-dist-linux-gfx120X-all-7.9.0rc20251201.tar.gz",
+            "therock-dist-linux-gfx120X-all-7.10.0a20251114.tar.gz",
+            "therock-dist-linux-gfx110X-all-7.10.0a20251231.tar.gz",
+        ]
+        self.assertEqual(
+            pick_latest(names, "therock-dist-linux-gfx120X-all"),
+            "therock-dist-linux-gfx120X-all-7.9.0rc20251201.tar.gz",
+        )
+
+    def testBreaksDateTiesByName(self):
+        names = [
+            "therock-dist-linux-gfx1151-7.10.0a20251113.tar.gz",
+            "therock-dist-linux-gfx1151-7.11.0a20251113.tar.gz",
+            "therock-dist-linux-gfx1151-7.10.1a20251113.tar.gz",
+        ]
+        self.assertEqual(
+            pick_latest(names, "gfx1151"),
+            "therock-dist-linux-gfx1151-7.11.0a20251113.tar.gz",
+        )
+
+    def testNoMatch(self):
+        self.assertEqual(
+            pick_latest(
+                ["therock-dist-linux-gfx1151-7.10.0a20251113.tar.gz"], "gfx94X"
+            ),
+            "",
+        )
+        self.assertEqual(pick_latest([], "gfx1151"), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
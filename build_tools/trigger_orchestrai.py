@@ -10,14 +10,27 @@ Now we skip the email step entirely and trigger Jenkins directly with the proper
 """
 
 import argparse
+import concurrent.futures
 import copy
+import functools
+import importlib.util
 import json
 import os
 import platform
 import subprocess
 import sys
+import threading
 import time
-from typing import Optional
+from typing import List, Optional
+
+from _therock_utils.tarball_listing import (
+    LISTING_CHUNK_SIZE,
+    TARBALL_PREFIX,
+    is_release_tarball,
+    s3_bucket_name,
+    scan_tarball_names,
+    tarball_sort_key,
+)
 
 # Try to import requests, but make it optional for parameter generation
 try:
@@ -26,6 +39,11 @@ try:
 except ImportError:
     REQUESTS_AVAILABLE = False
 
+# S3 buckets are listed with boto3 when it is installed, falling back to
+# parsing the listing page. It is only imported once a bucket is listed, so
+# runs given --sdk-url and trigger runs do not pay for loading it
+BOTO3_AVAILABLE = importlib.util.find_spec("boto3") is not None
+
 
 # GPU architecture pattern to Jenkins GPU tag mapping
 # This maps TheRock build architecture patterns to Jenkins agent GPU patterns
@@ -63,37 +81,135 @@ JENKINS_URL = "https://ucicd-jenkins.amd.com"
 # JENKINS_JOB = "ucicd-production-v1"
 JENKINS_JOB = "DevOps/nm/ucicd-production-v1"
 DEFAULT_POOL_TYPE = "default_therock_hot"
+# Jenkins jobs triggered at once; each one mostly waits on queue polling
+MAX_PARALLEL_TRIGGERS = 16
+# Waiting for a queued build: first poll delay, doubling up to the cap, and
+# the overall limit (seconds)
+QUEUE_POLL_INITIAL_DELAY = 0.25
+QUEUE_POLL_MAX_DELAY = 4.0
+QUEUE_POLL_TIMEOUT = 120
+# (connect, read) timeout for Jenkins API requests
+JENKINS_TIMEOUT = (5, 30)
 
+# Host OS, which decides between the PowerShell and curl listing commands
+IS_WINDOWS = platform.system().lower() == "windows"
+
+# Shared HTTP session, so bucket listings fetched for several patterns reuse
+# one keep-alive connection instead of a fresh curl/TLS handshake each
+HTTP_SESSION = requests.Session() if REQUESTS_AVAILABLE else None
+
+
+def stream_command_output(cmd: List[str], timeout: int = 60, chunk_size: int = 64 * 1024):
+    """
+    Run a command (an argv list, run without a shell) and yield its stdout in
+    chunks as it is produced, rather than buffering all of it.
+
+    Raises:
+        subprocess.TimeoutExpired: The command ran longer than timeout seconds
+        subprocess.CalledProcessError: The command exited with a non-zero status
+    """
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        try:
+            while chunk := proc.stdout.read(chunk_size):
+                yield chunk
+            stderr = proc.stderr.read()
+            returncode = proc.wait()
+        finally:
+            timer.cancel()
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr.decode(errors="replace"))
 
-def run_command(cmd: str, timeout: int = 60) -> subprocess.CompletedProcess:
-    """Execute a command and return the result."""
-    try:
-        result = subprocess.run(
-            cmd,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=timeout
-        )
-        return result
-    except subprocess.TimeoutExpired:
-        class MockResult:
-            returncode = 124
-            stdout = ""
-            stderr = f"Command timed out after {timeout} seconds"
-        return MockResult()
-    except Exception as e:
-        class MockResult:
-            returncode = 1
-            stdout = ""
-            stderr = str(e)
-        return MockResult()
+
+def _stream_listing_with_subprocess(s3_bucket_url: str):
+    """
+    Stream a bucket listing from curl (or PowerShell on Windows), for when
+    requests is not installed.
+    """
+    if IS_WINDOWS:
+        cmd = ["powershell", "-Command", f"(Invoke-WebRequest -Uri '{s3_bucket_url}' -UseBasicParsing).Content"]
+    else:
+        cmd = ["curl", "-s", s3_bucket_url]
+    return stream_command_output(cmd, chunk_size=LISTING_CHUNK_SIZE)
+
+
+@functools.lru_cache(maxsize=None)
+def _s3_client():
+    import boto3
+    from botocore import UNSIGNED
+    from botocore.config import Config
+
+    # The tarball buckets are public, so requests are sent unsigned
+    return boto3.client("s3", config=Config(signature_version=UNSIGNED))
+
+
+def _list_s3_tarball_names(bucket: str, prefix: str):
+    """
+    Yield the non-adhoc .tar.gz keys in a public bucket that start with prefix.
+
+    S3 filters by prefix server side, so only matching keys are transferred.
+    """
+    paginator = _s3_client().get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix, PaginationConfig={"PageSize": 1000}):
+        for obj in page.get("Contents", []):
+            if is_release_tarball(obj["Key"]):
+                yield obj["Key"]
+
+
+def _listing_errors(s3_bucket_url: str) -> tuple:
+    """Return the errors listing s3_bucket_url can fail with, given the lister used for it."""
+    errors = (OSError, subprocess.SubprocessError)
+    if REQUESTS_AVAILABLE:
+        errors += (requests.RequestException,)
+    if s3_bucket_name(s3_bucket_url) and BOTO3_AVAILABLE:
+        from botocore.exceptions import BotoCoreError, ClientError
+        errors += (BotoCoreError, ClientError)
+    return errors
+
+
+@functools.lru_cache(maxsize=4)
+def _list_bucket_once(s3_bucket_url: str) -> tuple:
+    """
+    Return the release tarball names in a bucket, listing it only on the first
+    call for each URL.
+
+    get_latest_s3_tarball() picks from this for each architecture pattern. A
+    failed listing raises and is retried on the next call.
+    """
+    print(f"Listing tarballs in {s3_bucket_url}")
+    bucket = s3_bucket_name(s3_bucket_url)
+    if bucket and BOTO3_AVAILABLE:
+        return tuple(_list_s3_tarball_names(bucket, TARBALL_PREFIX))
+    if REQUESTS_AVAILABLE:
+        # Scan the listing as it streams in rather than buffering all of it
+        with HTTP_SESSION.get(s3_bucket_url, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            return tuple(scan_tarball_names(response.iter_content(LISTING_CHUNK_SIZE)))
+    return tuple(scan_tarball_names(_stream_listing_with_subprocess(s3_bucket_url)))
+
+
+def pick_latest(names, search_pattern: str) -> str:
+    """Return the newest tarball name containing search_pattern, or "" if none does."""
+    return max((name for name in names if search_pattern in name), key=tarball_sort_key, default="")
 
 
 def get_latest_s3_tarball(s3_bucket_url: str, arch_pattern: str) -> str:
     """
     Get the latest tar.gz file URL from S3 bucket matching the architecture pattern.
 
+    The bucket is listed once per run (see _list_bucket_once()) and shared by
+    all patterns.
+
     Args:
         s3_bucket_url: The S3 bucket URL
         arch_pattern: The GPU architecture pattern to match (e.g., "linux-gfx120X-all")
@@ -116,20 +232,13 @@ def get_latest_s3_tarball(s3_bucket_url: str, arch_pattern: str) -> str:
 
     print(f"Searching for latest tarball in {s3_bucket_url} matching pattern {search_pattern}")
 
-    # Build the command to get the latest tarball matching the pattern
-    if platform.system().lower() == "windows":
-        escaped_pattern = search_pattern.replace("[", "`[").replace("]", "`]")
-        cmd = f'powershell -Command "$content = (Invoke-WebRequest -Uri \'{s3_bucket_url}\' -UseBasicParsing).Content; $content | Select-String -Pattern \'<Key>([^<]*{escaped_pattern}[^<]*\\.tar\\.gz)</Key>\' -AllMatches | ForEach-Object {{$_.Matches.Groups[1].Value}} | Where-Object {{$_ -notmatch \'ADHOCBUILD\'}} | Sort-Object {{[regex]::Match($_, \'[0-9]{{8}}\').Value}} | Select-Object -Last 1"'
-    else:
-        cmd = f'curl -s "{s3_bucket_url}" | grep -oP \'(?<=<Key>)[^<]*{search_pattern}[^<]*\\.tar\\.gz(?=</Key>)|(?<="name": ")[^"]*{search_pattern}[^"]*\\.tar\\.gz(?=")\' | grep -v "ADHOCBUILD" | awk \'{{match($0, /[0-9]{{8}}/); print substr($0, RSTART, 8), $0}}\' | sort -k1 -n | tail -1 | cut -d" " -f2'
-
-    result = run_command(cmd)
-
-    if result.returncode != 0:
-        print(f"ERROR: Failed to get S3 bucket listing: {result.stderr}", file=sys.stderr)
+    listing_errors = _listing_errors(s3_bucket_url)
+    try:
+        names = _list_bucket_once(s3_bucket_url)
+    except listing_errors as e:
+        print(f"ERROR: Failed to get S3 bucket listing: {e}", file=sys.stderr)
         return ""
-
-    latest_filename = result.stdout.strip()
+    latest_filename = pick_latest(names, search_pattern)
 
     if not latest_filename:
         print(f"ERROR: No tar.gz file found matching pattern '{search_pattern}'", file=sys.stderr)
@@ -286,12 +395,42 @@ def generate_trigger_configs(
     return configs
 
 
+def jenkins_session(jenkins_user: str, jenkins_token: str) -> "requests.Session":
+    """
+    Create an authenticated Jenkins session that several triggers can share,
+    with a keep-alive connection for each parallel trigger.
+    """
+    session = requests.Session()
+    session.auth = (jenkins_user, jenkins_token)
+    session.verify = True
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=MAX_PARALLEL_TRIGGERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_crumb(session: "requests.Session", jenkins_url: str) -> Optional[dict]:
+    """
+    Fetch the CSRF crumb header for jenkins_url.
+
+    Returns None if the crumb issuer did not answer with one.
+    """
+    r = session.get(f"{jenkins_url}/crumbIssuer/api/json", timeout=JENKINS_TIMEOUT)
+    if not r.ok:
+        return None
+    j = r.json()
+    return {j['crumbRequestField']: j['crumb']}
+
+
 def trigger_jenkins_job(
     builds_json: str,
     jenkins_user: str,
     jenkins_token: str,
     jenkins_url: str = JENKINS_URL,
-    jenkins_job: str = JENKINS_JOB
+    jenkins_job: str = JENKINS_JOB,
+    session: Optional["requests.Session"] = None,
+    gpu_tag: Optional[str] = None,
+    crumb: Optional[dict] = None
 ) -> dict:
     """
     Trigger a Jenkins job with the given BUILDS_JSON parameter.
@@ -302,6 +441,12 @@ def trigger_jenkins_job(
         jenkins_token: Jenkins API token
         jenkins_url: Jenkins server URL
         jenkins_job: Jenkins job name
+        session: Optional session from jenkins_session() to share between
+            triggers (one is created from the credentials otherwise)
+        gpu_tag: Optional GPU tag to prefix progress messages with, so the
+            output of parallel triggers can be told apart
+        crumb: Optional CSRF crumb header from get_crumb() to share between
+            triggers (fetched for this trigger otherwise)
 
     Returns:
         dict: Result with 'success', 'queue_url', 'build_number', 'error' keys
@@ -314,9 +459,8 @@ def trigger_jenkins_job(
             "build_number": None
         }
 
-    session = requests.Session()
-    session.auth = (jenkins_user, jenkins_token)
-    session.verify = True
+    if session is None:
+        session = jenkins_session(jenkins_user, jenkins_token)
 
     result = {
         "success": False,
@@ -324,21 +468,18 @@ def trigger_jenkins_job(
         "build_number": None,
         "error": None
     }
+    tag = f"[{gpu_tag}] " if gpu_tag else ""
 
     try:
         # Get crumb for CSRF protection
-        crumb_url = f"{jenkins_url}/crumbIssuer/api/json"
-        crumb = {}
-        r = session.get(crumb_url)
-        if r.ok:
-            j = r.json()
-            crumb = {j['crumbRequestField']: j['crumb']}
+        if crumb is None:
+            crumb = get_crumb(session, jenkins_url) or {}
 
         # Trigger the build
         trigger_url = f"{jenkins_url}/job/{jenkins_job}/buildWithParameters"
         params = {"BUILDS_JSON": builds_json}
 
-        r = session.post(trigger_url, headers=crumb, data=params)
+        r = session.post(trigger_url, headers=crumb, data=params, timeout=JENKINS_TIMEOUT)
 
         if r.status_code not in (201, 302):
             result["error"] = f"Trigger failed: {r.status_code} {r.text}"
@@ -346,23 +487,27 @@ def trigger_jenkins_job(
 
         queue_url = r.headers.get("Location")
         result["queue_url"] = queue_url
-        print(f"Enqueued at: {queue_url}")
+        print(f"{tag}Enqueued at: {queue_url}")
 
-        # Poll queue to get build number
+        # Poll queue to get build number, quickly at first and then backing off
         if queue_url:
             api_queue_url = queue_url if queue_url.endswith('/api/json') else queue_url + "api/json"
-            for _ in range(60):
-                q = session.get(api_queue_url, headers=crumb).json()
+            delay = QUEUE_POLL_INITIAL_DELAY
+            deadline = time.monotonic() + QUEUE_POLL_TIMEOUT
+            while True:
+                q = session.get(api_queue_url, headers=crumb, timeout=JENKINS_TIMEOUT).json()
                 if q.get("executable"):
                     build_number = q["executable"]["number"]
                     result["build_number"] = build_number
                     result["success"] = True
-                    print(f"Build assigned: {build_number}")
-                    print(f"Console URL: {jenkins_url}/job/{jenkins_job}/{build_number}/console")
+                    print(f"{tag}Build assigned: {build_number}")
+                    print(f"{tag}Console URL: {jenkins_url}/job/{jenkins_job}/{build_number}/console")
                     break
-                time.sleep(2)
-            else:
-                result["error"] = "Timed out waiting for build assignment"
+                if time.monotonic() + delay > deadline:
+                    result["error"] = "Timed out waiting for build assignment"
+                    break
+                time.sleep(delay)
+                delay = min(delay * 2, QUEUE_POLL_MAX_DELAY)
 
     except Exception as e:
         result["error"] = str(e)
@@ -520,19 +665,41 @@ def main():
             print("ERROR: 'requests' library required for trigger mode. Install with: pip install requests", file=sys.stderr)
             sys.exit(1)
 
-        # Trigger Jenkins for each configuration
+        # Trigger Jenkins for every configuration at once; each trigger spends
+        # most of its time waiting for Jenkins to assign a build
+        session = jenkins_session(args.jenkins_user, args.jenkins_token)
+        # One crumb serves every trigger; if it cannot be fetched now, each
+        # trigger fetches its own
+        try:
+            crumb = get_crumb(session, args.jenkins_url)
+        except (requests.RequestException, ValueError):
+            crumb = None
+        print(f"\nTriggering Jenkins for {', '.join(c['gpu_tag'] for c in configs)}...")
         results = []
-        for config in configs:
-            print(f"\nTriggering Jenkins for {config['gpu_tag']}...")
-            result = trigger_jenkins_job(
-                builds_json=config["builds_json"],
-                jenkins_user=args.jenkins_user,
-                jenkins_token=args.jenkins_token,
-                jenkins_url=args.jenkins_url,
-                jenkins_job=args.jenkins_job
-            )
-            result["config"] = config
-            results.append(result)
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(MAX_PARALLEL_TRIGGERS, len(configs))
+        ) as executor:
+            futures = {}
+            for config in configs:
+                future = executor.submit(
+                    trigger_jenkins_job,
+                    builds_json=config["builds_json"],
+                    jenkins_user=args.jenkins_user,
+                    jenkins_token=args.jenkins_token,
+                    jenkins_url=args.jenkins_url,
+                    jenkins_job=args.jenkins_job,
+                    session=session,
+                    gpu_tag=config["gpu_tag"],
+                    crumb=crumb
+                )
+                futures[future] = config
+
+            for future in concurrent.futures.as_completed(futures):
+                result = future.result()
+                result["config"] = futures[future]
+                if not result["success"]:
+                    print(f"ERROR: {futures[future]['gpu_tag']}: {result['error']}", file=sys.stderr)
+                results.append(result)
 
         # Summary
         successful = sum(1 for r in results if r["success"])